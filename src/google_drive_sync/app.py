@@ -7,7 +7,11 @@ A tool for synchronizing media files between Google Drive and Google Photos.
 
 import os
 import sys
+import time
+import queue
 import logging
+import logging.handlers
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog
 from datetime import datetime
@@ -22,6 +26,13 @@ from .conflict_resolver import ConflictResolver
 class Application(tk.Tk):
     """Main application window and controller"""
     
+    # How often queued log lines are flushed to the log widget, and how many per flush
+    LOG_DRAIN_INTERVAL_MS = 50
+    LOG_DRAIN_BATCH = 200
+    
+    # Seconds the window waits on close for a cancelled sync to finish its current files
+    CLOSE_TIMEOUT = 5.0
+    
     def __init__(self):
         super().__init__()
         
@@ -36,14 +47,43 @@ class Application(tk.Tk):
         self.sync_engine = None
         self.selected_folder_id = None
         
+        # A single long-lived daemon worker runs queued syncs so its HTTP connections
+        # stay warm; a None job tells it to exit
+        self._sync_jobs = queue.SimpleQueue()
+        self._sync_worker = threading.Thread(target=self._run_sync_jobs, name="sync", daemon=True)
+        self._sync_worker.start()
+        self._cancel_sync = threading.Event()
+        
+        # Log lines are queued by any thread and written to the widget in batches
+        self._log_queue = queue.Queue()
+        
+        # Latest progress/status values reported by the sync worker, and the values
+        # _drain_log last wrote to the widgets
+        self._pending_progress = None
+        self._pending_status = None
+        self._shown_progress = None
+        self._shown_status = None
+        
+        # Runs handed to the sync worker and runs it has finished; _drain_log resets
+        # the sync buttons once every queued run is done
+        self._runs_started = 0
+        self._runs_finished = 0
+        self._shown_runs_finished = 0
+        
+        # (epoch second, formatted timestamp) of the most recent log line
+        self._last_timestamp = (0, "")
+        
         # Setup logging
         self.setup_logging()
         
         # Create UI
         self.create_ui()
+        self.after(self.LOG_DRAIN_INTERVAL_MS, self._drain_log)
         
         # Check authentication status on startup
         self.update_auth_status()
+        
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def setup_logging(self):
         """Configure application logging"""
@@ -52,14 +92,24 @@ class Application(tk.Tk):
         
         log_file = os.path.join(log_dir, f"sync_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
         
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        file_handler = logging.FileHandler(log_file)
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+        
+        # Records are handed to a background listener so the sync worker never
+        # blocks on disk or console I/O while logging
+        log_queue = queue.SimpleQueue()
         logging.basicConfig(
             level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
+            handlers=[logging.handlers.QueueHandler(log_queue)]
         )
+        
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, stream_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
     
     def create_ui(self):
         """Create the application UI"""
@@ -151,29 +201,60 @@ class Application(tk.Tk):
             self.revoke_button.config(state=tk.NORMAL)
             self.select_folder_button.config(state=tk.NORMAL)
             
-            # Initialize services
-            self.drive_manager = DriveManager(self.auth_manager.get_drive_service())
-            self.photos_manager = PhotosManager(self.auth_manager.get_photos_service())
-            
-            self.log("Authentication successful")
+            # Initialize services once per authentication, keeping listings between
+            # runs so later syncs only fetch what changed
+            if self.drive_manager is None:
+                cache_dir = self.auth_manager.metadata_cache_dir
+                cache_dir.mkdir(exist_ok=True)
+                self.drive_manager = DriveManager(self.auth_manager.get_drive_service(),
+                                                  cache_path=cache_dir / 'drive.db')
+                self.photos_manager = PhotosManager(self.auth_manager.get_photos_service(),
+                                                    cache_path=cache_dir / 'photos.db')
+                
+                self.log("Authentication successful")
         else:
+            self._close_managers()
             self.auth_status_label.config(text="Not authenticated")
             self.auth_button.config(state=tk.NORMAL)
             self.revoke_button.config(state=tk.DISABLED)
             self.select_folder_button.config(state=tk.DISABLED)
             self.start_button.config(state=tk.DISABLED)
+            
+    def _close_managers(self):
+        """Close the Drive and Photos managers, releasing their caches and connections"""
+        if self.drive_manager:
+            self.drive_manager.close()
+            self.drive_manager = None
+        if self.photos_manager:
+            self.photos_manager.close()
+            self.photos_manager = None
     
     def authenticate(self):
         """Authenticate with Google APIs"""
+        # The OAuth flow blocks until the browser redirect returns, so run it
+        # off the Tk event loop to keep the window responsive
+        self.auth_button.config(state=tk.DISABLED)
+        auth_thread = threading.Thread(target=self._auth_worker, daemon=True)
+        auth_thread.start()
+    
+    def _auth_worker(self):
+        """Run authentication on a worker thread and report back to the UI thread"""
         try:
-            success = self.auth_manager.authenticate()
-            self.update_auth_status()
+            self.auth_manager.authenticate()
         except Exception as e:
             self.log(f"Authentication error: {str(e)}")
+        finally:
+            self.after(0, self.update_auth_status)
     
     def revoke_access(self):
         """Revoke API access"""
+        if self._runs_finished != self._runs_started:
+            self.log("Wait for the sync to finish before revoking access")
+            return
+            
         try:
+            # Release the metadata caches so revoking can delete them
+            self._close_managers()
             self.auth_manager.revoke_credentials()
             self.update_auth_status()
             self.log("Access revoked successfully")
@@ -262,7 +343,7 @@ class Application(tk.Tk):
             
         try:
             # Create conflict resolver
-            conflict_resolver = ConflictResolver(self)
+            conflict_resolver = ConflictResolver(self, session=self.photos_manager.session)
             
             # Create sync engine
             self.sync_engine = SyncEngine(
@@ -275,26 +356,22 @@ class Application(tk.Tk):
             # Update UI
             self.start_button.config(state=tk.DISABLED)
             self.stop_button.config(state=tk.NORMAL)
-            self.progress_bar["value"] = 0
+            # Revoking closes the managers and deletes the caches the run is using
+            self.revoke_button.config(state=tk.DISABLED)
+            self.update_progress(0)
             
-            # Start sync in a separate thread
-            import threading
-            sync_thread = threading.Thread(
-                target=self.sync_engine.start_sync,
-                kwargs={
-                    "progress_callback": self.update_progress,
-                    "status_callback": self.update_status,
-                    "log_callback": self.log
-                }
-            )
-            sync_thread.daemon = True
-            sync_thread.start()
+            # Start sync on the worker thread. Each run gets its own event, so
+            # starting again can't un-cancel a run that is still winding down.
+            self._cancel_sync = threading.Event()
+            self._runs_started += 1
+            self._sync_jobs.put((self.sync_engine, self._cancel_sync))
             
         except Exception as e:
             self.log(f"Error starting sync: {str(e)}")
     
     def stop_sync(self):
         """Stop synchronization process"""
+        self._cancel_sync.set()
         if self.sync_engine:
             self.sync_engine.stop_sync()
             self.log("Sync stopped by user")
@@ -302,26 +379,115 @@ class Application(tk.Tk):
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
     
+    def _run_sync_jobs(self):
+        """Run queued syncs one after another on the worker thread"""
+        while (job := self._sync_jobs.get()) is not None:
+            sync_engine, cancel_event = job
+            try:
+                if not cancel_event.is_set():
+                    sync_engine.start_sync(
+                        progress_callback=self.update_progress,
+                        status_callback=self.update_status,
+                        log_callback=self.log,
+                        cancel_event=cancel_event
+                    )
+            except Exception:
+                logging.exception("Sync run failed")
+                self.update_status("Sync failed")
+            finally:
+                # Picked up by _drain_log on the Tk thread
+                self._runs_finished += 1
+    
+    def _on_syncs_finished(self):
+        """Reset the sync buttons once the worker has no runs left"""
+        self.stop_button.config(state=tk.DISABLED)
+        if self.drive_manager:
+            self.revoke_button.config(state=tk.NORMAL)
+            if self.selected_folder_id:
+                self.start_button.config(state=tk.NORMAL)
+    
+    def on_close(self):
+        """Cancel any running sync and close the window"""
+        self._cancel_sync.set()
+        self._sync_jobs.put(None)
+        
+        # The caches can only be closed once the worker is done with them; if it
+        # is still busy, they are left to close with the process
+        self._sync_worker.join(timeout=self.CLOSE_TIMEOUT)
+        if not self._sync_worker.is_alive():
+            self._close_managers()
+        self._log_listener.stop()
+        self.destroy()
+    
     def update_progress(self, value):
-        """Update progress bar"""
-        self.progress_bar["value"] = value
-        self.update_idletasks()
+        """Update progress bar
+        
+        Safe to call from any thread; the widget is updated by _drain_log.
+        """
+        self._pending_progress = value
     
     def update_status(self, status):
-        """Update status label"""
-        self.status_label.config(text=status)
-        self.update_idletasks()
+        """Update status label
+        
+        Safe to call from any thread; the widget is updated by _drain_log.
+        """
+        self._pending_status = status
     
     def log(self, message):
-        """Add message to log"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_message = f"[{timestamp}] {message}\n"
+        """Add message to log
         
-        self.log_text.insert(tk.END, log_message)
-        self.log_text.see(tk.END)
+        Safe to call from any thread; the widget is updated by _drain_log.
+        """
+        timestamp = self._timestamp()
+        self._log_queue.put(f"[{timestamp}] {message}\n")
         
         # Also log to system logger
         logging.info(message)
+    
+    def _timestamp(self):
+        """Return the current local time formatted for the log, reused within a second"""
+        second = int(time.time())
+        cached_second, cached = self._last_timestamp
+        if second != cached_second:
+            cached = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+            self._last_timestamp = (second, cached)
+        return cached
+    
+    def _drain_log(self):
+        """Write queued log lines to the log widget in a single insert
+        
+        Also applies the latest progress and status values, so several updates
+        between two polls cost one redraw, and resets the sync buttons when the
+        worker finishes.
+        """
+        progress = self._pending_progress
+        if progress != self._shown_progress:
+            self.progress_bar["value"] = progress
+            self._shown_progress = progress
+            
+        status = self._pending_status
+        if status != self._shown_status:
+            self.status_label.config(text=status)
+            self._shown_status = status
+            
+        finished = self._runs_finished
+        if finished != self._shown_runs_finished:
+            self._shown_runs_finished = finished
+            if finished == self._runs_started:
+                self._on_syncs_finished()
+                
+        batch = []
+        try:
+            while len(batch) < self.LOG_DRAIN_BATCH:
+                batch.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+            
+        if batch:
+            self.log_text.insert(tk.END, "".join(batch))
+            self.log_text.see(tk.END)
+            
+        self.after(self.LOG_DRAIN_INTERVAL_MS, self._drain_log)
 
 
 def main():
@@ -4,13 +4,12 @@ Handles OAuth2 authentication for Google Drive and Google Photos
 """
 
 import os
-import pickle
+import json
 import logging
+import shutil
+import threading
+import time
 from pathlib import Path
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 
 
 class AuthManager:
@@ -23,6 +22,12 @@ class AuthManager:
         'https://www.googleapis.com/auth/photoslibrary.sharing'
     ]
     
+    # Seconds for which is_authenticated() reuses its previous answer
+    AUTH_STATUS_TTL = 5.0
+    
+    # Seconds before a Drive API request times out
+    HTTP_TIMEOUT = 30
+    
     def __init__(self, token_dir: str | None = None):
         """Initialize the authentication manager
         
@@ -32,12 +37,18 @@ class AuthManager:
         self.credentials = None
         self.drive_service = None
         self.photos_service = None
+        self._lock = threading.Lock()
+        self._auth_status = False
+        self._auth_status_time = float('-inf')
         
         # Set token directory
         self.token_dir = Path(token_dir) if token_dir else Path.cwd()
         self.token_dir.mkdir(exist_ok=True)
         
-        self.token_file = self.token_dir / 'token.pickle'
+        self.token_file = self.token_dir / 'token.json'
+        self.legacy_token_file = self.token_dir / 'token.pickle'
+        self.http_cache_dir = self.token_dir / '.httpcache'
+        self.metadata_cache_dir = self.token_dir / '.metadata'
         
         # Get credentials file path from environment variable or use default
         self.credentials_file = os.environ.get('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
@@ -48,50 +59,157 @@ class AuthManager:
         Returns:
             bool: True if authentication was successful, False otherwise
         """
-        try:
-            # Load existing credentials
-            if self.token_file.exists():
-                with open(self.token_file, 'rb') as token:
-                    self.credentials = pickle.load(token)
+        # The Google client libraries are slow to import, so they are loaded on
+        # first use rather than when the application window is being created
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        
+        # authenticate() may run on a worker thread; serialize concurrent attempts
+        with self._lock:
+            try:
+                # Load existing credentials
+                if self.token_file.exists():
+                    data = json.loads(self.token_file.read_bytes())
+                    self.credentials = Credentials.from_authorized_user_info(data, self.SCOPES)
                     logging.debug("Loaded existing credentials from token file")
+                elif self.legacy_token_file.exists():
+                    self.credentials = self._migrate_legacy_token()
                     
-            # If there are no valid credentials, get new ones
-            if not self.credentials or not self.credentials.valid:
-                if self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                    # Refresh expired credentials
-                    logging.info("Refreshing expired credentials")
-                    self.credentials.refresh(Request())
-                else:
-                    # Get new credentials
-                    credentials_path = Path(self.credentials_file)
-                    if not credentials_path.exists():
-                        raise FileNotFoundError(
-                            f"Credentials file '{self.credentials_file}' not found. "
-                            "Please download it from Google Cloud Console and place it in the project directory "
-                            "or set the GOOGLE_CREDENTIALS_FILE environment variable."
-                        )
+                # If there are no valid credentials, get new ones
+                if not self.credentials or not self.credentials.valid:
+                    if self.credentials and self.credentials.expired and self.credentials.refresh_token:
+                        # Refresh expired credentials
+                        logging.info("Refreshing expired credentials")
+                        self.credentials.refresh(Request())
+                    else:
+                        # Get new credentials
+                        credentials_path = Path(self.credentials_file)
+                        try:
+                            client_config = json.loads(credentials_path.read_bytes())
+                        except FileNotFoundError:
+                            raise FileNotFoundError(
+                                f"Credentials file '{self.credentials_file}' not found. "
+                                "Please download it from Google Cloud Console and place it in the project directory "
+                                "or set the GOOGLE_CREDENTIALS_FILE environment variable."
+                            ) from None
                     
-                    logging.info("Obtaining new credentials via OAuth flow")    
-                    flow = InstalledAppFlow.from_client_secrets_file(
-                        str(credentials_path), self.SCOPES)
-                    self.credentials = flow.run_local_server(port=0)
+                        logging.info("Obtaining new credentials via OAuth flow")    
+                        flow = InstalledAppFlow.from_client_config(client_config, self.SCOPES)
+                        self.credentials = flow.run_local_server(port=0)
                     
-                # Save credentials for next run
-                with open(self.token_file, 'wb') as token:
-                    pickle.dump(self.credentials, token)
-                    logging.debug("Saved credentials to token file")
+                    # Save credentials for next run
+                    self._save_token()
                     
-            # Build service objects
-            logging.info("Building service objects")
-            self.drive_service = build('drive', 'v3', credentials=self.credentials)
-            self.photos_service = build('photoslibrary', 'v1', credentials=self.credentials)
+                # Build service objects
+                logging.info("Building service objects")
+                self.drive_service = self._build_service('drive', 'v3', http=self._authorized_http())
+                self.photos_service = self._build_service('photoslibrary', 'v1')
+            
+                return True
+            
+            except Exception as e:
+                logging.error(f"Authentication failed: {str(e)}")
+                return False
+                
+            finally:
+                self._invalidate_auth_status()
+            
+    def _build_service(self, name: str, version: str, http=None):
+        """Build an API service object without a network discovery round-trip
+        
+        The discovery document bundled with google-api-python-client is used when
+        available. APIs that are not bundled fall back to fetching the document.
+        
+        Args:
+            name: API name, e.g. 'drive'
+            version: API version, e.g. 'v3'
+            http: Authorized HTTP client to send requests through. Defaults to None,
+                which builds a plain client from the credentials.
+            
+        Returns:
+            Service resource for the API
+        """
+        from googleapiclient.discovery import build
+        from googleapiclient.errors import UnknownApiNameOrVersion
+        
+        transport = {'http': http} if http is not None else {'credentials': self.credentials}
+        model = self._json_model()
+        try:
+            return build(name, version, cache_discovery=False, static_discovery=True, model=model, **transport)
+        except UnknownApiNameOrVersion:
+            logging.debug(f"No bundled discovery document for {name} {version}, fetching it")
+            return build(name, version, cache_discovery=False, static_discovery=False, model=model, **transport)
+            
+    def _json_model(self):
+        """Get a response model that parses JSON with orjson, if it is installed
+        
+        Large listing responses parse noticeably faster with orjson. It is an
+        optional dependency (the 'fast' extra).
+        
+        Returns:
+            JsonModel instance, or None to use the client library's default
+        """
+        try:
+            import orjson
+        except ImportError:
+            return None
+        from googleapiclient.model import JsonModel
+        
+        class OrjsonModel(JsonModel):
+            def deserialize(self, content):
+                try:
+                    body = orjson.loads(content)
+                except orjson.JSONDecodeError:
+                    return super().deserialize(content)
+                if self._data_wrapper and isinstance(body, dict) and 'data' in body:
+                    body = body['data']
+                return body
+                
+        return OrjsonModel(data_wrapper=False)
             
-            return True
+    def _authorized_http(self):
+        """Create an authorized HTTP client with an on-disk response cache
+        
+        httplib2 stores responses that carry an ETag or Last-Modified header and
+        revalidates them, so an unchanged resource comes back as 304 Not Modified
+        without its body. The client keeps its connection open between requests.
+        
+        Returns:
+            google_auth_httplib2.AuthorizedHttp wrapping the current credentials
+        """
+        import httplib2
+        from google_auth_httplib2 import AuthorizedHttp
+        
+        http = httplib2.Http(cache=str(self.http_cache_dir), timeout=self.HTTP_TIMEOUT)
+        return AuthorizedHttp(self.credentials, http=http)
             
-        except Exception as e:
-            logging.error(f"Authentication failed: {str(e)}")
-            return False
+    def _save_token(self) -> None:
+        """Persist the current credentials to the JSON token file"""
+        self.token_file.write_text(self.credentials.to_json(), encoding='utf-8')
+        logging.debug("Saved credentials to token file")
+        
+    def _migrate_legacy_token(self):
+        """Convert a token.pickle written by older versions to token.json
+        
+        Returns:
+            The migrated credentials, or None if the legacy file could not be read
+        """
+        import pickle
+        
+        try:
+            with open(self.legacy_token_file, 'rb') as token:
+                credentials = pickle.load(token)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logging.warning(f"Could not read legacy token file: {e}")
+            return None
             
+        self.credentials = credentials
+        self._save_token()
+        self.legacy_token_file.unlink()
+        logging.info("Migrated legacy token.pickle to token.json")
+        return credentials
+        
     def get_drive_service(self):
         """Get Google Drive service object"""
         if not self.drive_service:
@@ -105,15 +223,61 @@ class AuthManager:
         return self.photos_service
         
     def is_authenticated(self) -> bool:
-        """Check if user is authenticated"""
-        return self.credentials is not None and self.credentials.valid
+        """Check if user is authenticated
+        
+        The result is cached for AUTH_STATUS_TTL seconds so frequent UI polling
+        does not re-evaluate the credentials each time.
+        """
+        now = time.monotonic()
+        if now - self._auth_status_time < self.AUTH_STATUS_TTL:
+            return self._auth_status
+            
+        self._auth_status = self.credentials is not None and self.credentials.valid
+        self._auth_status_time = now
+        return self._auth_status
+        
+    def _invalidate_auth_status(self) -> None:
+        """Force the next is_authenticated() call to re-check the credentials"""
+        self._auth_status_time = float('-inf')
         
     def revoke_credentials(self) -> None:
         """Revoke stored credentials"""
-        if self.token_file.exists():
-            self.token_file.unlink()
-            logging.info("Credentials revoked and token file deleted")
+        for token_file in (self.token_file, self.legacy_token_file):
+            if token_file.exists():
+                token_file.unlink()
+                logging.info(f"Credentials revoked and {token_file.name} deleted")
+                
+        # Cached responses and metadata belong to the revoked account
+        shutil.rmtree(self.http_cache_dir, ignore_errors=True)
+        shutil.rmtree(self.metadata_cache_dir, ignore_errors=True)
             
         self.credentials = None
         self.drive_service = None
-        self.photos_service = None
\ No newline at end of file
+        self.photos_service = None
+        self._invalidate_auth_status()
+
+
+def thread_authorized_http(service, local: threading.local):
+    """Get the calling thread's own authorized HTTP connection for a service
+    
+    httplib2 connections are not thread-safe, so each thread that sends requests
+    gets an authorized Http object of its own, stored in the given thread-local.
+    Services without credentials attached (such as test doubles) get None,
+    meaning their default transport.
+    
+    Args:
+        service: API service resource the requests are made through
+        local: Thread-local storage owned by the caller
+        
+    Returns:
+        AuthorizedHttp for the calling thread, or None
+    """
+    http = getattr(local, 'http', None)
+    if http is None:
+        credentials = getattr(getattr(service, '_http', None), 'credentials', None)
+        if credentials is not None:
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.http import build_http
+            http = AuthorizedHttp(credentials, http=build_http())
+            local.http = http
+    return http
\ No newline at end of file
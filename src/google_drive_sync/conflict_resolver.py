@@ -6,8 +6,12 @@ Handles conflicts when same filename/size but different dates are found
 import io
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
 from datetime import datetime
 from enum import Enum, auto
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Dict, Optional, Union
 
@@ -16,6 +20,40 @@ import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
 
+THUMBNAIL_SIZE = 256  # Size requested from Drive/Photos
+PREVIEW_SIZE = (240, 240)  # Size the preview is scaled down to for display
+THUMBNAIL_CACHE_SIZE = 64
+THUMBNAIL_POLL_MS = 50  # How often the Tk thread checks for a finished preview download
+
+_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+_BOLD_FONT = ('TkDefaultFont', 9, 'bold')
+
+# Timestamps closer than this are treated as the same moment by auto_resolve_batch
+SAME_TIME_TOLERANCE = 1.0
+
+
+@lru_cache(maxsize=65536)
+def parse_iso_datetime(datetime_str: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp from the Google APIs, memoized per string
+    
+    Comparisons and dialogs see the same timestamps many times over, so each
+    distinct string is only parsed once.
+    
+    Args:
+        datetime_str: Timestamp such as '2024-01-01T12:00:00Z'
+        
+    Returns:
+        Parsed datetime, or None if the string is missing or invalid
+    """
+    if not datetime_str:
+        return None
+    try:
+        iso_str = datetime_str[:-1] + '+00:00' if datetime_str.endswith('Z') else datetime_str
+        return datetime.fromisoformat(iso_str)
+    except (ValueError, TypeError):
+        return None
+
 
 class ConflictResolution(Enum):
     """Enum representing possible conflict resolution choices"""
@@ -27,11 +65,63 @@ class ConflictResolution(Enum):
 class ConflictResolver:
     """Handles conflicts between files with same name/size but different dates"""
     
-    def __init__(self, parent: tk.Tk):
+    # Decoded previews keyed by file ID, least recently shown first
+    _THUMB_CACHE: OrderedDict[str, ImageTk.PhotoImage] = OrderedDict()
+    
+    def __init__(self, parent: tk.Tk, session: Optional[requests.Session] = None):
+        """Initialize the conflict resolver
+        
+        Args:
+            parent: Window the conflict dialog belongs to
+            session: Optional pooled HTTP session to download previews with
+        """
         self.parent = parent
+        self._session = session
         self.result: Optional[str] = None
         self.drive_image: Optional[ImageTk.PhotoImage] = None
         self.photos_image: Optional[ImageTk.PhotoImage] = None
+        # The dialog is built on first use, then hidden and reused for later conflicts
+        self._dialog: Optional[tk.Toplevel] = None
+        self._result_var: Optional[tk.StringVar] = None
+        self._panels: Dict[bool, Dict[str, Any]] = {}
+        
+    def auto_resolve_batch(self, conflicts: list[Dict[str, Any]]) -> tuple[list[Dict[str, Any]], list[Dict[str, Any]]]:
+        """Resolve the conflicts that can be decided without asking the user
+        
+        The Photos API reports no checksum or size, so timestamps are all there is
+        to go on. A pair is the same file when the Photos creation time is within
+        SAME_TIME_TOLERANCE seconds of the Drive created or modified time, which
+        allows for the two services rounding the same moment differently.
+        Everything else still needs a dialog.
+        
+        Args:
+            conflicts: List of conflict dictionaries with 'drive_file' and 'photos_item'
+            
+        Returns:
+            Tuple of (resolved conflicts with a 'resolution' key, conflicts left for the user)
+        """
+        resolved = []
+        ambiguous = []
+        
+        for conflict in conflicts:
+            drive_file = conflict['drive_file']
+            photos_item = conflict['photos_item']
+            
+            photos_time = parse_iso_datetime(photos_item.get('creation_time'))
+            same = photos_time is not None and any(
+                drive_time is not None
+                and abs(drive_time.timestamp() - photos_time.timestamp()) < SAME_TIME_TOLERANCE
+                for drive_time in (parse_iso_datetime(drive_file.get('createdTime')),
+                                   parse_iso_datetime(drive_file.get('modifiedTime')))
+            )
+            
+            if same:
+                resolved.append({**conflict, 'resolution': 'same'})
+            else:
+                ambiguous.append(conflict)
+                
+        logging.debug("Auto-resolved %s of %s conflicts", len(resolved), len(conflicts))
+        return resolved, ambiguous
         
     def resolve_conflict(self, drive_file: Dict[str, Any], photos_item: Dict[str, Any]) -> str:
         """
@@ -45,20 +135,42 @@ class ConflictResolver:
             'same', 'different', or 'cancel'
         """
         self.result = None
-        logging.debug(f"Resolving conflict for {drive_file.get('name', 'unknown')}")
+        logging.debug("Resolving conflict for %s", drive_file.get('name', 'unknown'))
         
-        # Create conflict resolution dialog
-        dialog = tk.Toplevel(self.parent)
-        dialog.title("Resolve File Conflict")
-        dialog.geometry("700x500")
-        dialog.transient(self.parent)
-        dialog.grab_set()
+        dialog = self._ensure_dialog()
+        self._show_file_info(drive_file, is_drive=True)
+        self._show_file_info(photos_item, is_drive=False)
         
         # Center the dialog
         dialog.geometry("+%d+%d" % (
             self.parent.winfo_rootx() + 50, 
             self.parent.winfo_rooty() + 50
         ))
+        dialog.update_idletasks()
+        dialog.deiconify()
+        dialog.grab_set()
+        
+        # Wait for user decision
+        self._result_var.set('')
+        dialog.wait_variable(self._result_var)
+        return self.result
+        
+    def _ensure_dialog(self) -> tk.Toplevel:
+        """Build the conflict dialog the first time it is needed
+        
+        Returns:
+            The (possibly hidden) dialog window
+        """
+        if self._dialog is not None and self._dialog.winfo_exists():
+            return self._dialog
+            
+        # Create conflict resolution dialog
+        dialog = tk.Toplevel(self.parent)
+        dialog.withdraw()  # Stay hidden until populated so it is drawn once
+        dialog.title("Resolve File Conflict")
+        dialog.geometry("700x500")
+        dialog.transient(self.parent)
+        dialog.protocol("WM_DELETE_WINDOW", lambda: self._set_result('cancel'))
         
         # Main frame
         main_frame = ttk.Frame(dialog, padding="20")
@@ -82,14 +194,12 @@ class ConflictResolver:
         # Google Drive file info
         drive_frame = ttk.LabelFrame(comparison_frame, text="Google Drive File", padding="10")
         drive_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
-        
-        self._add_file_info(drive_frame, drive_file, is_drive=True)
+        self._panels[True] = self._create_info_panel(drive_frame)
         
         # Google Photos file info
         photos_frame = ttk.LabelFrame(comparison_frame, text="Google Photos File", padding="10")
         photos_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
-        
-        self._add_file_info(photos_frame, photos_item, is_drive=False)
+        self._panels[False] = self._create_info_panel(photos_frame)
         
         # Decision buttons
         button_frame = ttk.Frame(main_frame)
@@ -106,68 +216,199 @@ class ConflictResolver:
         btn_frame.pack()
         
         ttk.Button(btn_frame, text="Yes, same file", 
-                  command=lambda: self._set_result(dialog, 'same')).pack(side=tk.LEFT, padx=(0, 10))
+                  command=lambda: self._set_result('same')).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(btn_frame, text="No, different files", 
-                  command=lambda: self._set_result(dialog, 'different')).pack(side=tk.LEFT, padx=(0, 10))
+                  command=lambda: self._set_result('different')).pack(side=tk.LEFT, padx=(0, 10))
         ttk.Button(btn_frame, text="Cancel", 
-                  command=lambda: self._set_result(dialog, 'cancel')).pack(side=tk.LEFT)
+                  command=lambda: self._set_result('cancel')).pack(side=tk.LEFT)
         
-        # Wait for user decision
-        dialog.wait_window()
-        return self.result
+        self._dialog = dialog
+        self._result_var = tk.StringVar(dialog)
+        # Don't leave resolve_conflict waiting if the application closes the dialog
+        dialog.bind('<Destroy>', lambda event: self._result_var.set('cancel') if event.widget is dialog else None)
+        return dialog
         
-    def _add_file_info(self, parent_frame: ttk.Frame, file_info: Dict[str, Any], is_drive: bool = True) -> None:
-        """Add file information to the frame
+    def _create_info_panel(self, parent_frame: ttk.Frame) -> Dict[str, Any]:
+        """Create the empty widgets that show one side of the conflict
         
         Args:
-            parent_frame: The parent frame to add information to
-            file_info: Dictionary containing file metadata
-            is_drive: Whether this is Drive (True) or Photos (False) file
+            parent_frame: The parent frame to add the panel to
+            
+        Returns:
+            Dictionary with the rows frame, its label pairs and the preview label
         """
         info_frame = ttk.Frame(parent_frame)
         info_frame.pack(fill=tk.BOTH, expand=True)
         
+        # One grid for all rows instead of a packed frame per row
+        rows_frame = ttk.Frame(info_frame)
+        rows_frame.pack(fill=tk.X)
+        rows_frame.columnconfigure(1, weight=1)
+        
+        preview = ttk.Label(info_frame)
+        preview.pack(pady=(10, 0))
+        
+        return {'rows_frame': rows_frame, 'rows': [], 'preview': preview}
+        
+    def _show_file_info(self, file_info: Dict[str, Any], is_drive: bool = True) -> None:
+        """Show file information in the Drive or Photos panel
+        
+        Row labels are reused between conflicts; only their text changes.
+        
+        Args:
+            file_info: Dictionary containing file metadata
+            is_drive: Whether this is Drive (True) or Photos (False) file
+        """
         if is_drive:
             # Google Drive file info
-            self._add_info_row(info_frame, "Name:", file_info.get('name', 'Unknown'))
-            self._add_info_row(info_frame, "Size:", self._format_size(file_info.get('size', '0')))
-            self._add_info_row(info_frame, "Created:", self._format_datetime(file_info.get('createdTime', '')))
-            self._add_info_row(info_frame, "Modified:", self._format_datetime(file_info.get('modifiedTime', '')))
-            self._add_info_row(info_frame, "MIME Type:", file_info.get('mimeType', 'Unknown'))
+            rows = [
+                ("Name:", file_info.get('name', 'Unknown')),
+                ("Size:", self._format_size(file_info.get('size', '0'))),
+                ("Created:", self._format_datetime(file_info.get('createdTime', ''))),
+                ("Modified:", self._format_datetime(file_info.get('modifiedTime', ''))),
+                ("MIME Type:", file_info.get('mimeType', 'Unknown')),
+            ]
         else:
             # Google Photos file info
             metadata = file_info
-            self._add_info_row(info_frame, "Name:", metadata.get('filename', 'Unknown'))
-            self._add_info_row(info_frame, "Size:", "Unknown")  # Photos API doesn't provide size
-            self._add_info_row(info_frame, "Created:", self._format_datetime(metadata.get('creation_time', '')))
-            self._add_info_row(info_frame, "MIME Type:", metadata.get('mime_type', 'Unknown'))
-            self._add_info_row(info_frame, "Dimensions:", f"{metadata.get('width', 'Unknown')} x {metadata.get('height', 'Unknown')}")
+            rows = [
+                ("Name:", metadata.get('filename', 'Unknown')),
+                ("Size:", "Unknown"),  # Photos API doesn't provide size
+                ("Created:", self._format_datetime(metadata.get('creation_time', ''))),
+                ("MIME Type:", metadata.get('mime_type', 'Unknown')),
+                ("Dimensions:", f"{metadata.get('width', 'Unknown')} x {metadata.get('height', 'Unknown')}"),
+            ]
             
             if metadata.get('is_photo'):
-                self._add_info_row(info_frame, "Type:", "Photo")
+                rows.append(("Type:", "Photo"))
                 if metadata.get('camera_make'):
-                    self._add_info_row(info_frame, "Camera:", f"{metadata.get('camera_make')} {metadata.get('camera_model', '')}")
+                    rows.append(("Camera:", f"{metadata.get('camera_make')} {metadata.get('camera_model', '')}"))
             elif metadata.get('is_video'):
-                self._add_info_row(info_frame, "Type:", "Video")
+                rows.append(("Type:", "Video"))
                 if metadata.get('fps'):
-                    self._add_info_row(info_frame, "FPS:", str(metadata.get('fps')))
+                    rows.append(("FPS:", str(metadata.get('fps'))))
                     
-    def _add_info_row(self, parent: ttk.Frame, label: str, value: str) -> None:
-        """Add a label-value row to the info frame
+        panel = self._panels[is_drive]
+        rows_frame = panel['rows_frame']
+        row_widgets = panel['rows']
+        while len(row_widgets) < len(rows):
+            i = len(row_widgets)
+            label_widget = ttk.Label(rows_frame, font=_BOLD_FONT)
+            label_widget.grid(row=i, column=0, sticky=tk.W, pady=2)
+            value_widget = ttk.Label(rows_frame, wraplength=250)
+            value_widget.grid(row=i, column=1, sticky=tk.W, padx=(10, 0), pady=2)
+            row_widgets.append((label_widget, value_widget))
+            
+        for i, (label_widget, value_widget) in enumerate(row_widgets):
+            if i < len(rows):
+                label, value = rows[i]
+                label_widget.configure(text=label)
+                value_widget.configure(text=str(value))
+                label_widget.grid()
+                value_widget.grid()
+            else:
+                label_widget.grid_remove()
+                value_widget.grid_remove()
+                
+        self._load_preview(panel['preview'], file_info, is_drive)
+        
+    def _load_preview(self, preview: ttk.Label, file_info: Dict[str, Any], is_drive: bool) -> None:
+        """Show a small preview of the file, fetching it in the background if it isn't cached
+        
+        Args:
+            preview: Label to show the preview in
+            file_info: Dictionary containing file metadata
+            is_drive: Whether this is Drive (True) or Photos (False) file
+        """
+        if is_drive:
+            link = file_info.get('thumbnailLink')
+            url = f"{link.rsplit('=s', 1)[0]}=s{THUMBNAIL_SIZE}" if link else None
+        else:
+            base_url = file_info.get('base_url')
+            url = f"{base_url}=w{THUMBNAIL_SIZE}-h{THUMBNAIL_SIZE}" if base_url else None
+            
+        if not url or not file_info.get('id'):
+            preview.cache_key = None
+            preview.configure(image='', text="")
+            return
+            
+        cache_key = f"{'drive' if is_drive else 'photos'}:{file_info['id']}"
+        preview.cache_key = cache_key  # Late downloads for a previous conflict are ignored
+        
+        photo = self._THUMB_CACHE.get(cache_key)
+        if photo is not None:
+            self._THUMB_CACHE.move_to_end(cache_key)
+            self._set_preview(preview, photo)
+            return
+            
+        preview.configure(image='', text="Loading preview...")
+        future: Future = Future()
+        threading.Thread(target=self._fetch_thumbnail, args=(cache_key, url, future), daemon=True).start()
+        self._await_thumbnail(preview, cache_key, future)
+        
+    def _fetch_thumbnail(self, cache_key: str, url: str, future: Future) -> None:
+        """Download and decode a thumbnail off the Tk thread
         
         Args:
-            parent: Parent frame to add the row to
-            label: Label text
-            value: Value text
+            cache_key: Key the thumbnail will be cached under, for logging
+            url: Thumbnail URL
+            future: Receives the decoded image, or None if it could not be loaded
         """
-        row_frame = ttk.Frame(parent)
-        row_frame.pack(fill=tk.X, pady=2)
+        try:
+            response = (self._session or requests).get(url, timeout=30)
+            response.raise_for_status()
+            image = Image.open(io.BytesIO(response.content))
+            image.thumbnail(PREVIEW_SIZE, Image.Resampling.BILINEAR)
+        except (requests.RequestException, OSError) as e:
+            logging.warning("Could not load preview %s: %s", cache_key, e)
+            image = None
+        future.set_result(image)
+        
+    def _await_thumbnail(self, preview: ttk.Label, cache_key: str, future: Future) -> None:
+        """Poll from the Tk thread until a thumbnail download finishes, then show it
         
-        label_widget = ttk.Label(row_frame, text=label, font=('TkDefaultFont', 9, 'bold'))
-        label_widget.pack(side=tk.LEFT, anchor=tk.W)
+        Args:
+            preview: Label that will show the thumbnail
+            cache_key: Key to cache the decoded thumbnail under
+            future: Future filled in by _fetch_thumbnail
+        """
+        if not preview.winfo_exists():
+            return
+        if not future.done():
+            preview.after(THUMBNAIL_POLL_MS, self._await_thumbnail, preview, cache_key, future)
+            return
+        self._show_thumbnail(preview, cache_key, future.result())
         
-        value_widget = ttk.Label(row_frame, text=str(value), wraplength=250)
-        value_widget.pack(side=tk.LEFT, anchor=tk.W, padx=(10, 0))
+    def _show_thumbnail(self, preview: ttk.Label, cache_key: str, image: Optional[Image.Image]) -> None:
+        """Cache a decoded thumbnail and display it
+        
+        Args:
+            preview: Label to show the thumbnail in
+            cache_key: Key to cache the thumbnail under
+            image: Decoded thumbnail, or None if it could not be loaded
+        """
+        showing = getattr(preview, 'cache_key', None) == cache_key
+        if image is None:
+            if showing:
+                preview.configure(text="Preview unavailable")
+            return
+            
+        photo = ImageTk.PhotoImage(image)
+        self._THUMB_CACHE[cache_key] = photo
+        while len(self._THUMB_CACHE) > THUMBNAIL_CACHE_SIZE:
+            self._THUMB_CACHE.popitem(last=False)
+        if showing:
+            self._set_preview(preview, photo)
+        
+    def _set_preview(self, preview: ttk.Label, photo: ImageTk.PhotoImage) -> None:
+        """Display a thumbnail in a preview label
+        
+        Args:
+            preview: Label to show the thumbnail in
+            photo: Thumbnail to show
+        """
+        preview.configure(image=photo, text="")
+        preview.image = photo  # Keep a reference in case the cache evicts it
         
     def _format_size(self, size_str: Union[str, int]) -> str:
         """Format file size in human readable format
@@ -180,15 +421,16 @@ class ConflictResolver:
         """
         try:
             size = int(size_str)
-            for unit in ['B', 'KB', 'MB', 'GB']:
-                if size < 1024.0:
-                    return f"{size:.1f} {unit}"
-                size /= 1024.0
-            return f"{size:.1f} TB"
         except (ValueError, TypeError):
-            logging.warning(f"Could not format size: {size_str}")
+            logging.warning("Could not format size: %s", size_str)
             return "Unknown"
             
+        if size <= 0:
+            return "0.0 B"
+        # Each unit is 2**10 of the previous one, so the bit length picks the unit
+        unit = min(size.bit_length() - 1, 40) // 10
+        return f"{size / (1 << (unit * 10)):.1f} {_UNITS[unit]}"
+            
     def _format_datetime(self, datetime_str: Optional[str]) -> str:
         """Format datetime string in readable format
         
@@ -200,25 +442,23 @@ class ConflictResolver:
         """
         if not datetime_str:
             return "Unknown"
-            
-        try:
-            # Parse ISO format datetime
-            if 'T' in datetime_str:
-                dt = datetime.fromisoformat(datetime_str.replace('Z', '+00:00'))
-                return dt.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                return datetime_str
-        except (ValueError, TypeError) as e:
-            logging.warning(f"Failed to parse datetime {datetime_str}: {e}")
+        if 'T' not in datetime_str:
+            # Date-only strings are already readable
+            return datetime_str
+        parsed = parse_iso_datetime(datetime_str)
+        if parsed is None:
+            logging.warning("Failed to parse datetime %s", datetime_str)
             return datetime_str
+        return parsed.strftime("%Y-%m-%d %H:%M:%S")
             
-    def _set_result(self, dialog: tk.Toplevel, result: str) -> None:
-        """Set the result and close dialog
+    def _set_result(self, result: str) -> None:
+        """Set the result and hide the dialog for reuse
         
         Args:
-            dialog: The dialog window to close
             result: The resolution result ('same', 'different', or 'cancel')
         """
-        logging.debug(f"User selected: {result}")
+        logging.debug("User selected: %s", result)
         self.result = result
-        dialog.destroy()
\ No newline at end of file
+        self._dialog.grab_release()
+        self._dialog.withdraw()
+        self._result_var.set(result)
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Drive Metadata Cache
+Persists Drive file metadata in a local SQLite database between sync runs
+"""
+
+import json
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from .sqlite_store import SQLiteStore
+
+_SCHEMA = """
+create table if not exists files(
+    id text primary key,
+    name text,
+    size integer,
+    md5 text,
+    created text,
+    modified text,
+    mime_type text,
+    parent text,
+    ts real
+);
+create table if not exists meta(key text primary key, value text);
+create table if not exists listings(
+    folder_id text,
+    fields text,
+    token text,
+    files text,
+    folders text,
+    primary key(folder_id, fields)
+);
+"""
+
+
+class DriveMetadataCache(SQLiteStore):
+    """SQLite-backed store of Drive file metadata, kept current through the Changes API"""
+
+    def __init__(self, path: str | Path):
+        """Open (or create) the cache database
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        super().__init__(path, _SCHEMA)
+
+    def get(self, file_id: str) -> dict[str, Any] | None:
+        """Get the cached metadata of a file
+
+        Args:
+            file_id: ID of the file to look up
+
+        Returns:
+            File dictionary in Drive's format, or None if the file isn't cached
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "select id, name, size, md5, created, modified, mime_type, parent from files where id = ?",
+                (file_id,)
+            ).fetchone()
+        return _row_to_file(row) if row else None
+
+    def put_many(self, files: Iterable[dict[str, Any]]) -> None:
+        """Insert or replace the metadata of several files
+
+        Args:
+            files: File dictionaries as returned by the Drive API
+        """
+        now = time.time()
+        self._write_many("insert or replace into files values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         [_file_to_row(file_info, now) for file_info in files])
+
+    def delete_many(self, file_ids: Iterable[str]) -> None:
+        """Remove files from the cache
+
+        Args:
+            file_ids: IDs of the files to remove
+        """
+        self._write_many("delete from files where id = ?", [(file_id,) for file_id in file_ids])
+
+    def clear_files(self) -> None:
+        """Remove every cached file"""
+        with self._lock:
+            self._conn.execute("delete from files")
+
+    def get_page_token(self) -> str | None:
+        """Get the stored Changes API page token, if any"""
+        with self._lock:
+            row = self._conn.execute("select value from meta where key = 'page_token'").fetchone()
+        return row[0] if row else None
+
+    def set_page_token(self, token: str) -> None:
+        """Store the Changes API page token to resume from on the next run
+
+        Args:
+            token: Page token returned by Drive
+        """
+        with self._lock:
+            self._conn.execute("insert or replace into meta values ('page_token', ?)", (token,))
+
+    def get_listing(self, folder_id: str, fields: str) -> tuple[str, list[dict[str, Any]], set[str]] | None:
+        """Get the stored recursive listing of a folder
+
+        Args:
+            folder_id: ID of the listed folder
+            fields: Fields projection the listing was made with
+
+        Returns:
+            (Changes API page token the listing is current as of, files, IDs of the
+            folders in the tree), or None if no listing is stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "select token, files, folders from listings where folder_id = ? and fields = ?",
+                (folder_id, fields)
+            ).fetchone()
+        if not row:
+            return None
+        token, files, folders = row
+        return token, json.loads(files), set(json.loads(folders))
+
+    def put_listing(self, folder_id: str, fields: str, token: str,
+                    files: list[dict[str, Any]], folders: set[str]) -> None:
+        """Store the recursive listing of a folder
+
+        Args:
+            folder_id: ID of the listed folder
+            fields: Fields projection the listing was made with
+            token: Changes API page token the listing is current as of
+            files: Files in the tree
+            folders: IDs of the folders in the tree, including the listed folder
+        """
+        with self._lock:
+            self._conn.execute("insert or replace into listings values (?, ?, ?, ?, ?)",
+                               (folder_id, fields, token, json.dumps(files), json.dumps(sorted(folders))))
+
+
+def _file_to_row(file_info: dict[str, Any], now: float) -> tuple:
+    size = file_info.get('size')
+    parents = file_info.get('parents') or [None]
+    return (file_info['id'], file_info.get('name'), int(size) if size is not None else None,
+            file_info.get('md5Checksum'), file_info.get('createdTime'), file_info.get('modifiedTime'),
+            file_info.get('mimeType'), parents[0], now)
+
+
+def _row_to_file(row: tuple) -> dict[str, Any]:
+    file_id, name, size, md5, created, modified, mime_type, parent = row
+    file_info = {
+        'id': file_id,
+        'name': name,
+        'size': str(size) if size is not None else None,  # Drive returns sizes as strings
+        'md5Checksum': md5,
+        'createdTime': created,
+        'modifiedTime': modified,
+        'mimeType': mime_type,
+        'parents': [parent] if parent else None,
+    }
+    return {key: value for key, value in file_info.items() if value is not None}
@@ -6,24 +6,115 @@ Handles all Google Drive API operations
 import io
 import os
 import logging
+import mimetypes
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from collections.abc import Iterator
 from typing import Any
 
 from googleapiclient.discovery import Resource
 from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 from googleapiclient.errors import HttpError
 
+from .auth_manager import thread_authorized_http
+from .drive_cache import DriveMetadataCache
+
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Times a request is retried, with exponential backoff, after a rate limit (429)
+# or server error (5xx) before the error is reported
+NUM_RETRIES = 5
+
+# Seconds to wait before the first retry of a failed batched call; doubles each time
+RETRY_BASE_DELAY = 0.5
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Maximum number of calls Drive accepts in a single batch request
+MAX_BATCH_SIZE = 100
+
+# Maximum number of batch requests sent to Drive at the same time
+MAX_PARALLEL_REQUESTS = 10
+
+# Fields returned by folder listings and searches unless the caller asks for more.
+# Recursive listings need mimeType to tell folders apart from files.
+DEFAULT_LIST_FIELDS = "nextPageToken, files(id, name, mimeType, modifiedTime)"
+
+# Fields stored in the metadata cache for each file
+FILE_INFO_FIELDS = "id, name, size, createdTime, modifiedTime, mimeType, parents, md5Checksum"
+
+# Google Workspace documents, which have no file content to sync
+_WORKSPACE_MIME_TYPES = (
+    'application/vnd.google-apps.document',
+    'application/vnd.google-apps.spreadsheet',
+    'application/vnd.google-apps.presentation',
+)
+
+# Bytes fetched per request when downloading file content. Each chunk is held in
+# memory while it is written, once per concurrent download.
+DOWNLOAD_CHUNK_SIZE = 32 * 1024 * 1024
+
+# Files smaller than this are uploaded in a single request instead of a resumable session
+SIMPLE_UPLOAD_LIMIT = 5 * 1024 * 1024
+
+# Bytes sent per request when uploading through a resumable session
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# MIME types of the media formats we upload, keyed by lowercase file extension
+_EXT_TO_MIME: dict[str, str] = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.bmp': 'image/bmp',
+    '.webp': 'image/webp',
+    '.tiff': 'image/tiff',
+    '.tif': 'image/tiff',
+    '.mp4': 'video/mp4',
+    '.avi': 'video/x-msvideo',
+    '.mov': 'video/quicktime',
+    '.wmv': 'video/x-ms-wmv',
+    '.flv': 'video/x-flv',
+    '.webm': 'video/webm',
+    '.mkv': 'video/x-matroska',
+    '.m4v': 'video/x-m4v',
+    '.3gp': 'video/3gpp',
+    '.3g2': 'video/3gpp2',
+    '.heic': 'image/heic',
+    '.heif': 'image/heif'
+}
+
+
+def _is_retryable(error: Exception | None) -> bool:
+    """Whether a failed call was rejected for a reason that may clear on retry"""
+    return isinstance(error, HttpError) and error.resp.status in _RETRYABLE_STATUSES
+
 
 class DriveManager:
     """Manages Google Drive operations through the Drive API"""
     
-    def __init__(self, service: Resource):
+    def __init__(self, service: Resource, cache_path: str | Path | None = None):
         """Initialize the Drive Manager
         
         Args:
             service: Authenticated Google Drive API service resource
+            cache_path: SQLite file to persist file metadata in between runs.
+                Defaults to None, which disables the persistent cache.
         """
         self.service = service
+        self._executor: ThreadPoolExecutor | None = None
+        self._local = threading.local()
+        self._listing_cache: dict[tuple[str, bool, str], tuple[float, list[dict[str, Any]]]] = {}
+        # Uploads on the transfer pool invalidate listings concurrently
+        self._listing_lock = threading.Lock()
+        self._cache_ttl = 60.0
+        self._metadata_cache = DriveMetadataCache(cache_path) if cache_path else None
+        self._mkdir_cache: set[Path] = set()
         
     def list_folders(self, parent_id: str = 'root') -> list[dict[str, Any]]:
         """List all folders in Google Drive
@@ -35,74 +126,359 @@ class DriveManager:
             List of folder dictionaries with 'id' and 'name'
         """
         try:
-            logging.debug(f"Listing folders in parent_id: {parent_id}")
+            logging.debug("Listing folders in parent_id: %s", parent_id)
             results = self.service.files().list(
-                q=f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false",
-                fields="files(id, name, parents)"
-            ).execute()
+                q=f"'{parent_id}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+                fields="files(id, name, parents)",
+                supportsAllDrives=False
+            ).execute(num_retries=NUM_RETRIES)
             
             folders = results.get('files', [])
-            logging.debug(f"Found {len(folders)} folders")
+            logging.debug("Found %s folders", len(folders))
             return folders
             
         except HttpError as e:
-            logging.error(f"Error listing folders: {e}")
+            logging.error("Error listing folders: %s", e)
             return []
             
-    def get_folder_contents(self, folder_id: str, recursive: bool = True) -> list[dict[str, Any]]:
+    def get_folder_contents(self, folder_id: str, recursive: bool = True,
+                            fields: str = DEFAULT_LIST_FIELDS) -> list[dict[str, Any]]:
         """Get all files and subfolders in a Google Drive folder
         
         Args:
             folder_id: ID of the folder to get contents from
             recursive: Whether to include files from subfolders. Defaults to True.
+            fields: Drive fields projection for each page. Defaults to DEFAULT_LIST_FIELDS;
+                callers that need size, md5Checksum etc. must ask for them.
             
         Returns:
             List of file/folder dictionaries
         """
-        try:
-            logging.debug(f"Getting contents of folder: {folder_id}, recursive={recursive}")
-            files = []
-            page_token = None
+        return list(self.iter_folder_contents(folder_id, recursive, fields))
+        
+    def iter_folder_contents(self, folder_id: str, recursive: bool = True,
+                             fields: str = DEFAULT_LIST_FIELDS) -> Iterator[dict[str, Any]]:
+        """Yield the files in a Google Drive folder as each page of results arrives
+        
+        Callers can start processing the first page while later pages (or deeper
+        levels of the tree) are still being fetched. A listing that is consumed to
+        the end is cached like get_folder_contents.
+        
+        Args:
+            folder_id: ID of the folder to get contents from
+            recursive: Whether to include files from subfolders. Defaults to True.
+            fields: Drive fields projection for each page. Defaults to DEFAULT_LIST_FIELDS.
             
-            while True:
-                # Query for files in the folder (excluding Google Workspace files)
-                query = (f"'{folder_id}' in parents and trashed=false and "
-                        "mimeType!='application/vnd.google-apps.folder' and "
-                        "mimeType!='application/vnd.google-apps.document' and "
-                        "mimeType!='application/vnd.google-apps.spreadsheet' and "
-                        "mimeType!='application/vnd.google-apps.presentation'")
+        Yields:
+            File dictionaries
+        """
+        key = (folder_id, recursive, fields)
+        with self._listing_lock:
+            cached = self._listing_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self._cache_ttl:
+            logging.debug("Using cached contents of folder: %s, recursive=%s", folder_id, recursive)
+            yield from list(cached[1])
+            return
+            
+        files = []
+        try:
+            logging.debug("Getting contents of folder: %s, recursive=%s", folder_id, recursive)
+            if recursive:
+                items = self._iter_tree_contents(folder_id, fields)
+            else:
+                items = self._iter_folder_pages(folder_id, fields)
                 
-                results = self.service.files().list(
-                    q=query,
-                    fields="nextPageToken, files(id, name, size, createdTime, modifiedTime, mimeType, parents)",
-                    pageToken=page_token,
-                    pageSize=100  # Optimize by requesting maximum page size
-                ).execute()
+            for item in items:
+                files.append(item)
+                yield item
                 
-                batch_files = results.get('files', [])
-                files.extend(batch_files)
-                logging.debug(f"Retrieved {len(batch_files)} files from folder {folder_id}")
+        except HttpError as e:
+            logging.error("Error getting folder contents: %s", e)
+            return
+            
+        with self._listing_lock:
+            self._listing_cache[key] = (time.monotonic(), files)
+        
+    def _iter_folder_pages(self, folder_id: str, fields: str) -> Iterator[dict[str, Any]]:
+        """Yield the files directly inside a folder, one page of results at a time
+        
+        Args:
+            folder_id: ID of the folder to list
+            fields: Drive fields projection for each page
+            
+        Yields:
+            File dictionaries, excluding folders
+        """
+        page_token = None
+        
+        while True:
+            # Query for files in the folder (excluding Google Workspace files)
+            query = (f"'{folder_id}' in parents and trashed=false and "
+                    "mimeType!='application/vnd.google-apps.folder' and "
+                    "mimeType!='application/vnd.google-apps.document' and "
+                    "mimeType!='application/vnd.google-apps.spreadsheet' and "
+                    "mimeType!='application/vnd.google-apps.presentation'")
+            
+            results = self.service.files().list(
+                q=query,
+                fields=fields,
+                pageToken=page_token,
+                pageSize=100,  # Optimize by requesting maximum page size
+                supportsAllDrives=False
+            ).execute(num_retries=NUM_RETRIES)
+            
+            batch_files = results.get('files', [])
+            logging.debug("Retrieved %s files from folder %s", len(batch_files), folder_id)
+            yield from batch_files
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
                 
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
+    def invalidate_cache(self, folder_id: str | None = None) -> None:
+        """Drop cached folder listings
+        
+        Args:
+            folder_id: Folder whose contents changed. Its own listing and every
+                recursive listing (which may contain it) are dropped. Defaults to
+                None, which clears the whole cache.
+        """
+        with self._listing_lock:
+            if folder_id is None:
+                self._listing_cache.clear()
+                return
+            for key in [key for key in self._listing_cache if key[1] or key[0] == folder_id]:
+                del self._listing_cache[key]
+            
+    def _iter_tree_contents(self, root_id: str, fields: str,
+                            folders: set[str] | None = None) -> Iterator[dict[str, Any]]:
+        """Yield all files below a folder, listing each level of the tree in batches
+        
+        Every folder at the current depth (and every folder with another page of
+        results) is listed in one batch request, so a tree costs roughly one HTTP
+        round trip per level and page instead of two per folder. An error listing
+        any folder is raised, so a partial tree is never mistaken for a full one.
+        
+        Args:
+            root_id: ID of the folder to walk
+            fields: Drive fields projection for each page; must include mimeType
+            folders: Optional set that receives the ID of every folder in the tree
+            
+        Yields:
+            File dictionaries, excluding folders
+        """
+        found = 0
+        pending: dict[str, str | None] = {root_id: None}  # folder ID -> page token
+        if folders is not None:
+            folders.add(root_id)
+        
+        while pending:
+            requests = [
+                (folder_id, self.service.files().list(
+                    q=(f"'{folder_id}' in parents and trashed=false and "
+                       "mimeType!='application/vnd.google-apps.document' and "
+                       "mimeType!='application/vnd.google-apps.spreadsheet' and "
+                       "mimeType!='application/vnd.google-apps.presentation'"),
+                    fields=fields,
+                    pageToken=page_token,
+                    pageSize=100,
+                    supportsAllDrives=False
+                ))
+                for folder_id, page_token in pending.items()
+            ]
+            pending = {}
+            
+            for folder_id, (response, error) in self._execute_batch(requests).items():
+                if error is not None:
+                    # A tree with a folder missing must not be cached as complete
+                    logging.error("Error listing folder %s: %s", folder_id, error)
+                    raise error
                     
-            # If recursive, also get files from subfolders
-            if recursive:
-                subfolders = self.list_folders(folder_id)
-                for subfolder in subfolders:
-                    subfolder_files = self.get_folder_contents(subfolder['id'], recursive=True)
-                    files.extend(subfolder_files)
+                for item in response.get('files', []):
+                    if item.get('mimeType') == FOLDER_MIME_TYPE:
+                        pending[item['id']] = None
+                        if folders is not None:
+                            folders.add(item['id'])
+                    else:
+                        found += 1
+                        yield item
+                        
+                page_token = response.get('nextPageToken')
+                if page_token:
+                    pending[folder_id] = page_token
                     
-            return files
+            logging.debug("Collected %s files so far, %s folders pending", found, len(pending))
+        
+    def get_tree_contents(self, folder_id: str, fields: str = DEFAULT_LIST_FIELDS) -> list[dict[str, Any]]:
+        """Get all files below a folder, reusing the listing stored by a previous run
+        
+        With a metadata cache, the recursive listing is stored together with a
+        Changes API token. Later calls only replay the changes made since then,
+        unless a folder in the tree was added, moved or removed, in which case the
+        tree is listed again. Without a cache this is get_folder_contents.
+        
+        Args:
+            folder_id: ID of the folder to get contents from
+            fields: Drive fields projection for each page, in the form
+                "nextPageToken, files(...)"; the file fields must include mimeType
             
+        Returns:
+            List of file dictionaries, excluding folders
+        """
+        if 'files(' not in fields or 'mimeType' not in fields:
+            raise ValueError(f"fields must select files(...) including mimeType, got {fields!r}")
+            
+        if not self._metadata_cache:
+            return self.get_folder_contents(folder_id, recursive=True, fields=fields)
+            
+        stored = self._metadata_cache.get_listing(folder_id, fields)
+        if stored is not None:
+            files = self._apply_listing_changes(folder_id, fields, *stored)
+            if files is not None:
+                return files
+                
+        try:
+            # Files name the real ID of the root folder as their parent, not the alias
+            root_id = folder_id
+            if folder_id == 'root':
+                root_id = self.service.files().get(fileId='root', fields='id').execute(num_retries=NUM_RETRIES)['id']
+                
+            # Take the token first so changes made during the walk are replayed next time
+            token = self.get_start_page_token()
+            folders: set[str] = set()
+            files = list(self._iter_tree_contents(root_id, fields, folders))
         except HttpError as e:
-            logging.error(f"Error getting folder contents: {e}")
+            logging.error("Error getting folder contents: %s", e)
             return []
             
+        if token:
+            self._metadata_cache.put_listing(folder_id, fields, token, files, folders)
+        return files
+        
+    def _apply_listing_changes(self, folder_id: str, fields: str, token: str,
+                               files: list[dict[str, Any]], folders: set[str]) -> list[dict[str, Any]] | None:
+        """Bring a stored tree listing up to date with the Changes API
+        
+        Args:
+            folder_id: ID of the listed folder
+            fields: Fields projection the listing was made with
+            token: Changes API page token the listing is current as of
+            files: Stored files in the tree
+            folders: IDs of the folders in the tree
+            
+        Returns:
+            Updated list of files, or None if the tree must be listed again
+        """
+        file_fields = fields[fields.index('files(') + len('files('):fields.rindex(')')]
+        keep_parents = 'parents' in file_fields
+        by_id = {file_info['id']: file_info for file_info in files}
+        
+        try:
+            page_token = token
+            while page_token:
+                results = self.service.changes().list(
+                    pageToken=page_token,
+                    fields=("nextPageToken, newStartPageToken, changes(fileId, removed, "
+                            f"file({file_fields}{'' if keep_parents else ', parents'}, trashed))"),
+                    pageSize=1000,
+                    supportsAllDrives=False
+                ).execute(num_retries=NUM_RETRIES)
+                
+                for change in results.get('changes', []):
+                    file_id = change['fileId']
+                    file_info = change.get('file') or {}
+                    parents = file_info.get('parents') if keep_parents else file_info.pop('parents', None)
+                    in_tree = not folders.isdisjoint(parents or ())
+                    if file_id in folders or (in_tree and file_info.get('mimeType') == FOLDER_MIME_TYPE):
+                        logging.debug("Folder %s changed, listing folder %s again", file_id, folder_id)
+                        return None
+                        
+                    if (in_tree and not change.get('removed') and not file_info.pop('trashed', False)
+                            and file_info.get('mimeType') not in _WORKSPACE_MIME_TYPES):
+                        by_id[file_id] = file_info
+                    else:
+                        by_id.pop(file_id, None)
+                        
+                if 'newStartPageToken' in results:
+                    token = results['newStartPageToken']
+                page_token = results.get('nextPageToken')
+                
+        except HttpError as e:
+            logging.error("Error getting changes for folder %s: %s", folder_id, e)
+            return None
+            
+        files = list(by_id.values())
+        self._metadata_cache.put_listing(folder_id, fields, token, files, folders)
+        logging.debug("Brought the stored listing of folder %s up to date", folder_id)
+        return files
+        
+    def _execute_batch(self, requests: list[tuple[str, Any]]) -> dict[str, tuple[Any, Exception | None]]:
+        """Execute API requests as batch requests of at most MAX_BATCH_SIZE calls
+        
+        Args:
+            requests: List of (request_id, HttpRequest) pairs. IDs must be unique.
+            
+        Returns:
+            Dictionary mapping each request_id to a (response, exception) pair
+        """
+        results: dict[str, tuple[Any, Exception | None]] = {}
+        
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+            
+        # Batch parts don't get execute()'s built-in retries, so calls rejected by a
+        # rate limit or server error are resent with exponential backoff
+        for attempt in range(NUM_RETRIES + 1):
+            self._send_batches(requests, callback)
+            requests = [(request_id, request) for request_id, request in requests
+                        if _is_retryable(results[request_id][1])]
+            if not requests or attempt == NUM_RETRIES:
+                break
+            logging.debug("Retrying %s batched calls", len(requests))
+            time.sleep(RETRY_BASE_DELAY * 2 ** attempt + random.random() * 0.1)
+            
+        return results
+        
+    def _send_batches(self, requests: list[tuple[str, Any]], callback: Any) -> None:
+        """Send requests in batches of MAX_BATCH_SIZE, concurrently if there are several
+        
+        Args:
+            requests: List of (request_id, HttpRequest) pairs
+            callback: Called with (request_id, response, exception) for each request
+        """
+        batches = []
+        for start in range(0, len(requests), MAX_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for request_id, request in requests[start:start + MAX_BATCH_SIZE]:
+                batch.add(request, request_id=request_id)
+            batches.append(batch)
+            
+        if len(batches) == 1:
+            batches[0].execute()
+        else:
+            # Send the batches concurrently, each worker on its own connection
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL_REQUESTS,
+                                                    thread_name_prefix='drive')
+            futures = [self._executor.submit(self._execute_on_thread_http, batch)
+                       for batch in batches]
+            for future in futures:
+                future.result()
+                
+        
+    def _execute_on_thread_http(self, batch: Any) -> None:
+        """Execute a batch request using the calling thread's own HTTP connection"""
+        batch.execute(http=self._thread_http())
+        
+    def _thread_http(self) -> Any:
+        """Get the calling thread's own authorized HTTP connection, or None for the default"""
+        return thread_authorized_http(self.service, self._local)
+            
     def download_file(self, file_id: str, local_path: str | Path) -> bool:
         """Download a file from Google Drive
         
+        Safe to call from several threads at once.
+        
         Args:
             file_id: ID of the file to download
             local_path: Path where the file should be saved
@@ -111,31 +487,40 @@ class DriveManager:
             True if download was successful, False otherwise
         """
         try:
-            # Ensure directory exists
-            path = Path(local_path)
-            path.parent.mkdir(parents=True, exist_ok=True)
+            # Ensure directory exists, once per directory
+            parent = Path(local_path).parent
+            if parent not in self._mkdir_cache:
+                parent.mkdir(parents=True, exist_ok=True)
+                self._mkdir_cache.add(parent)
             
-            logging.debug(f"Downloading file {file_id} to {local_path}")
+            logging.debug("Downloading file %s to %s", file_id, local_path)
             request = self.service.files().get_media(fileId=file_id)
-            fh = io.FileIO(local_path, 'wb')
-            downloader = MediaIoBaseDownload(fh, request)
+            http = self._thread_http()
+            if http is not None:
+                request.http = http
+            debug = logging.getLogger().isEnabledFor(logging.DEBUG)
             
-            done = False
-            while done is False:
-                status, done = downloader.next_chunk()
-                logging.debug(f"Download progress: {int(status.progress() * 100)}%")
+            with io.BufferedWriter(io.FileIO(local_path, 'wb'), buffer_size=1 << 20) as fh:
+                downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
                 
-            fh.close()
-            logging.info(f"File {file_id} downloaded successfully to {local_path}")
+                done = False
+                while done is False:
+                    status, done = downloader.next_chunk(num_retries=NUM_RETRIES)
+                    if debug:
+                        logging.debug("Download progress: %d%%", int(status.progress() * 100))
+                        
+            logging.info("File %s downloaded successfully to %s", file_id, local_path)
             return True
             
         except HttpError as e:
-            logging.error(f"Error downloading file: {e}")
+            logging.error("Error downloading file: %s", e)
             return False
             
     def upload_file(self, local_path: str | Path, filename: str, parent_folder_id: str) -> str | None:
         """Upload a file to Google Drive
         
+        Safe to call from several threads at once.
+        
         Args:
             local_path: Path to the local file to upload
             filename: Name to give the file in Google Drive
@@ -146,7 +531,7 @@ class DriveManager:
         """
         try:
             local_path_str = str(local_path)
-            logging.debug(f"Uploading file {local_path_str} to folder {parent_folder_id} as {filename}")
+            logging.debug("Uploading file %s to folder %s as %s", local_path_str, parent_folder_id, filename)
             
             # Determine MIME type based on file extension
             mime_type = self._get_mime_type(local_path_str)
@@ -156,20 +541,38 @@ class DriveManager:
                 'parents': [parent_folder_id]
             }
             
-            media = MediaFileUpload(local_path_str, mimetype=mime_type, resumable=True)
-            
-            result = self.service.files().create(
+            # Small files go up in one multipart request; larger ones use a resumable
+            # session so a failed chunk can be retried without starting over
+            if os.path.getsize(local_path_str) < SIMPLE_UPLOAD_LIMIT:
+                media = MediaFileUpload(local_path_str, mimetype=mime_type, resumable=False)
+            else:
+                media = MediaFileUpload(local_path_str, mimetype=mime_type, resumable=True,
+                                        chunksize=UPLOAD_CHUNK_SIZE)
+                
+            request = self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields='id'
-            ).execute()
+            )
+            
+            http = self._thread_http()
+            if media.resumable():
+                debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+                result = None
+                while result is None:
+                    status, result = request.next_chunk(http=http, num_retries=NUM_RETRIES)
+                    if status and debug:
+                        logging.debug("Upload progress: %d%%", int(status.progress() * 100))
+            else:
+                result = request.execute(http=http, num_retries=NUM_RETRIES)
             
             file_id = result.get('id')
-            logging.info(f"File {filename} uploaded successfully with ID: {file_id}")
+            self.invalidate_cache(parent_folder_id)
+            logging.info("File %s uploaded successfully with ID: %s", filename, file_id)
             return file_id
             
         except HttpError as e:
-            logging.error(f"Error uploading file: {e}")
+            logging.error("Error uploading file: %s", e)
             return None
             
     def delete_file(self, file_id: str) -> bool:
@@ -182,14 +585,45 @@ class DriveManager:
             True if deletion was successful, False otherwise
         """
         try:
-            logging.debug(f"Deleting file with ID: {file_id}")
-            self.service.files().delete(fileId=file_id).execute()
-            logging.info(f"File {file_id} deleted successfully")
+            logging.debug("Deleting file with ID: %s", file_id)
+            self.service.files().delete(fileId=file_id).execute(num_retries=NUM_RETRIES)
+            self.invalidate_cache()
+            if self._metadata_cache:
+                self._metadata_cache.delete_many([file_id])
+            logging.info("File %s deleted successfully", file_id)
             return True
         except HttpError as e:
-            logging.error(f"Error deleting file: {e}")
+            logging.error("Error deleting file: %s", e)
             return False
             
+    def batch_delete(self, file_ids: list[str]) -> dict[str, bool]:
+        """Delete several files from Google Drive using batch requests
+        
+        Args:
+            file_ids: IDs of the files to delete
+            
+        Returns:
+            Dictionary mapping each file ID to True if it was deleted, False otherwise
+        """
+        try:
+            logging.debug("Batch deleting %s files", len(file_ids))
+            requests = [(file_id, self.service.files().delete(fileId=file_id))
+                        for file_id in dict.fromkeys(file_ids)]
+            results = {}
+            self.invalidate_cache()
+            for file_id, (_, error) in self._execute_batch(requests).items():
+                if error is not None:
+                    logging.error("Error deleting file %s: %s", file_id, error)
+                results[file_id] = error is None
+            if self._metadata_cache:
+                self._metadata_cache.delete_many(file_id for file_id, deleted in results.items() if deleted)
+            logging.info("Deleted %s of %s files", sum(results.values()), len(results))
+            return results
+            
+        except HttpError as e:
+            logging.error("Error batch deleting files: %s", e)
+            return {file_id: False for file_id in file_ids}
+            
     def get_file_info(self, file_id: str) -> dict[str, Any] | None:
         """Get detailed information about a file
         
@@ -199,17 +633,134 @@ class DriveManager:
         Returns:
             Dictionary with file information if successful, None otherwise
         """
+        if self._metadata_cache:
+            cached = self._metadata_cache.get(file_id)
+            if cached is not None:
+                return cached
+                
         try:
-            logging.debug(f"Getting info for file: {file_id}")
+            logging.debug("Getting info for file: %s", file_id)
             result = self.service.files().get(
                 fileId=file_id,
-                fields="id, name, size, createdTime, modifiedTime, mimeType, parents, md5Checksum"
-            ).execute()
+                fields=FILE_INFO_FIELDS
+            ).execute(num_retries=NUM_RETRIES)
+            if self._metadata_cache:
+                self._metadata_cache.put_many([result])
             return result
         except HttpError as e:
-            logging.error(f"Error getting file info: {e}")
+            logging.error("Error getting file info: %s", e)
             return None
             
+    def batch_get_file_info(self, file_ids: list[str]) -> dict[str, dict[str, Any] | None]:
+        """Get detailed information about several files using batch requests
+        
+        Args:
+            file_ids: IDs of the files to get information for
+            
+        Returns:
+            Dictionary mapping each file ID to its information, or None on failure
+        """
+        results = {}
+        missing = list(dict.fromkeys(file_ids))
+        if self._metadata_cache:
+            for file_id in missing:
+                results[file_id] = self._metadata_cache.get(file_id)
+            missing = [file_id for file_id, info in results.items() if info is None]
+            
+        try:
+            logging.debug("Batch getting info for %s files", len(missing))
+            requests = [
+                (file_id, self.service.files().get(
+                    fileId=file_id,
+                    fields=FILE_INFO_FIELDS
+                ))
+                for file_id in missing
+            ]
+            for file_id, (response, error) in self._execute_batch(requests).items():
+                if error is not None:
+                    logging.error("Error getting info for file %s: %s", file_id, error)
+                results[file_id] = response if error is None else None
+            if self._metadata_cache:
+                self._metadata_cache.put_many(info for info in results.values() if info is not None)
+            return results
+            
+        except HttpError as e:
+            logging.error("Error batch getting file info: %s", e)
+            return {file_id: None for file_id in file_ids}
+            
+    def get_start_page_token(self) -> str | None:
+        """Get the Changes API token for the current state of the Drive
+        
+        Returns:
+            Start page token if successful, None otherwise
+        """
+        try:
+            return self.service.changes().getStartPageToken().execute(num_retries=NUM_RETRIES).get('startPageToken')
+        except HttpError as e:
+            logging.error("Error getting start page token: %s", e)
+            return None
+            
+    def sync_changes(self) -> int:
+        """Apply the changes made in Drive since the last call to the metadata cache
+        
+        The first call only records where to start from; later calls pull just the
+        changed files instead of re-reading every file.
+        
+        Returns:
+            Number of changes applied
+        """
+        if not self._metadata_cache:
+            return 0
+            
+        page_token = self._metadata_cache.get_page_token()
+        if page_token is None:
+            # Files cached before tracking starts can't be brought up to date
+            page_token = self.get_start_page_token()
+            if page_token:
+                self._metadata_cache.clear_files()
+                self._metadata_cache.set_page_token(page_token)
+            return 0
+            
+        applied = 0
+        try:
+            while page_token:
+                results = self.service.changes().list(
+                    pageToken=page_token,
+                    fields=f"nextPageToken, newStartPageToken, changes(fileId, removed, file({FILE_INFO_FIELDS}, trashed))",
+                    pageSize=1000,
+                    supportsAllDrives=False
+                ).execute(num_retries=NUM_RETRIES)
+                
+                changes = results.get('changes', [])
+                removed = [change['fileId'] for change in changes
+                           if change.get('removed') or change.get('file', {}).get('trashed')]
+                updated = [change['file'] for change in changes
+                           if 'file' in change and not change['file'].get('trashed') and not change.get('removed')]
+                self._metadata_cache.delete_many(removed)
+                self._metadata_cache.put_many(updated)
+                applied += len(changes)
+                
+                if 'newStartPageToken' in results:
+                    self._metadata_cache.set_page_token(results['newStartPageToken'])
+                page_token = results.get('nextPageToken')
+                
+        except HttpError as e:
+            logging.error("Error syncing changes: %s", e)
+            
+        if applied:
+            self.invalidate_cache()
+        logging.info("Applied %s Drive changes to the metadata cache", applied)
+        return applied
+        
+    def close(self) -> None:
+        """Release the batch executor and the metadata cache"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._metadata_cache:
+            self._metadata_cache.close()
+            self._metadata_cache = None
+            
     def _get_mime_type(self, file_path: str) -> str:
         """Determine MIME type based on file extension
         
@@ -219,34 +770,12 @@ class DriveManager:
         Returns:
             MIME type string
         """
-        extension = os.path.splitext(file_path)[1].lower()
-        
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.bmp': 'image/bmp',
-            '.webp': 'image/webp',
-            '.tiff': 'image/tiff',
-            '.tif': 'image/tiff',
-            '.mp4': 'video/mp4',
-            '.avi': 'video/x-msvideo',
-            '.mov': 'video/quicktime',
-            '.wmv': 'video/x-ms-wmv',
-            '.flv': 'video/x-flv',
-            '.webm': 'video/webm',
-            '.mkv': 'video/x-matroska',
-            '.m4v': 'video/x-m4v',
-            '.3gp': 'video/3gpp',
-            '.3g2': 'video/3gpp2',
-            '.heic': 'image/heic',
-            '.heif': 'image/heif'
-        }
-        
-        mime_type = mime_types.get(extension, 'application/octet-stream')
-        logging.debug(f"Determined MIME type for {extension}: {mime_type}")
-        return mime_type
+        mime_type = _EXT_TO_MIME.get(os.path.splitext(file_path)[1].lower())
+        if mime_type:
+            return mime_type
+            
+        # Less common formats are left to the stdlib table
+        return mimetypes.guess_type(file_path, strict=False)[0] or 'application/octet-stream'
         
     def is_media_file(self, file_info: dict[str, Any]) -> bool:
         """Check if a file is a media file (image or video)
@@ -271,47 +800,50 @@ class DriveManager:
             Folder ID if successful, None otherwise
         """
         try:
-            logging.debug(f"Creating folder {folder_name} in parent {parent_folder_id}")
+            logging.debug("Creating folder %s in parent %s", folder_name, parent_folder_id)
             folder_metadata = {
                 'name': folder_name,
-                'mimeType': 'application/vnd.google-apps.folder',
+                'mimeType': FOLDER_MIME_TYPE,
                 'parents': [parent_folder_id]
             }
             
             folder = self.service.files().create(
                 body=folder_metadata,
                 fields='id'
-            ).execute()
+            ).execute(num_retries=NUM_RETRIES)
             
             folder_id = folder.get('id')
-            logging.info(f"Folder {folder_name} created successfully with ID: {folder_id}")
+            self.invalidate_cache(parent_folder_id)
+            logging.info("Folder %s created successfully with ID: %s", folder_name, folder_id)
             return folder_id
             
         except HttpError as e:
-            logging.error(f"Error creating folder: {e}")
+            logging.error("Error creating folder: %s", e)
             return None
             
-    def search_files(self, query: str) -> list[dict[str, Any]]:
+    def search_files(self, query: str, fields: str = DEFAULT_LIST_FIELDS) -> list[dict[str, Any]]:
         """Search for files in Google Drive using a query
         
         Args:
             query: Search query in Drive query format
+            fields: Drive fields projection for each page. Defaults to DEFAULT_LIST_FIELDS.
             
         Returns:
             List of file dictionaries matching the query
         """
         try:
-            logging.debug(f"Searching files with query: {query}")
+            logging.debug("Searching files with query: %s", query)
             files = []
             page_token = None
             
             while True:
                 results = self.service.files().list(
                     q=query,
-                    fields="nextPageToken, files(id, name, size, createdTime, modifiedTime, mimeType, parents)",
+                    fields=fields,
                     pageToken=page_token,
-                    pageSize=100
-                ).execute()
+                    pageSize=100,
+                    supportsAllDrives=False
+                ).execute(num_retries=NUM_RETRIES)
                 
                 batch_files = results.get('files', [])
                 files.extend(batch_files)
@@ -320,9 +852,9 @@ class DriveManager:
                 if not page_token:
                     break
                     
-            logging.debug(f"Found {len(files)} files matching query")
+            logging.debug("Found %s files matching query", len(files))
             return files
             
         except HttpError as e:
-            logging.error(f"Error searching files: {e}")
+            logging.error("Error searching files: %s", e)
             return []
\ No newline at end of file
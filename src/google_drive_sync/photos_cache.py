@@ -0,0 +1,106 @@
+"""
+Photos Metadata Cache
+Persists Google Photos media items in a local SQLite database between sync runs
+"""
+
+import json
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from .sqlite_store import SQLiteStore
+
+# Seconds a stored baseUrl stays usable; Google expires them after about an hour
+BASE_URL_TTL = 55 * 60
+
+_SCHEMA = """
+create table if not exists items(
+    id text primary key,
+    created text,
+    item text,
+    ts real
+);
+create table if not exists uploads(sha256 text primary key, item_id text);
+"""
+
+
+class PhotosMetadataCache(SQLiteStore):
+    """SQLite-backed store of media items already listed from or uploaded to Google Photos"""
+
+    def __init__(self, path: str | Path):
+        """Open (or create) the cache database
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        super().__init__(path, _SCHEMA)
+
+    def ids(self) -> set[str]:
+        """Get the IDs of every cached media item"""
+        with self._lock:
+            rows = self._conn.execute("select id from items").fetchall()
+        return {row[0] for row in rows}
+
+    def delete_many(self, item_ids: Iterable[str]) -> None:
+        """Remove media items from the cache, along with the uploads that created them
+
+        Args:
+            item_ids: IDs of the media items to remove
+        """
+        rows = [(item_id,) for item_id in item_ids]
+        self._write_many("delete from items where id = ?", rows)
+        self._write_many("delete from uploads where item_id = ?", rows)
+
+    def put_many(self, items: Iterable[dict[str, Any]]) -> None:
+        """Insert or replace several media items
+
+        Args:
+            items: Media item dictionaries as returned by the Photos API
+        """
+        now = time.time()
+        self._write_many("insert or replace into items values (?, ?, ?, ?)",
+                         [(item['id'], (item.get('mediaMetadata') or {}).get('creationTime'),
+                           json.dumps(item), now) for item in items])
+
+    def get_all(self) -> list[dict[str, Any]]:
+        """Get every cached media item, newest first
+
+        Items stored more than BASE_URL_TTL seconds ago are returned without their
+        baseUrl, since it will have expired.
+
+        Returns:
+            List of media item dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute("select item, ts from items order by created desc").fetchall()
+
+        stale_before = time.time() - BASE_URL_TTL
+        items = []
+        for item_json, ts in rows:
+            item = json.loads(item_json)
+            if ts < stale_before:
+                item.pop('baseUrl', None)
+            items.append(item)
+        return items
+
+    def get_upload(self, sha256: str) -> str | None:
+        """Get the media item created from a file with the given content hash
+
+        Args:
+            sha256: Hex SHA-256 digest of the file's contents
+
+        Returns:
+            Media item ID, or None if no such file was uploaded
+        """
+        with self._lock:
+            row = self._conn.execute("select item_id from uploads where sha256 = ?", (sha256,)).fetchone()
+        return row[0] if row else None
+
+    def put_uploads(self, uploads: Iterable[tuple[str, str]]) -> None:
+        """Remember the media items created from uploaded files
+
+        Args:
+            uploads: (hex SHA-256 digest, media item ID) pairs
+        """
+        self._write_many("insert or replace into uploads values (?, ?)", list(uploads))
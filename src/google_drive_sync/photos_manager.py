@@ -3,10 +3,14 @@ Google Photos Manager
 Handles all Google Photos API operations
 """
 
+import hashlib
 import io
 import os
 import logging
-from datetime import datetime
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 try:
@@ -15,9 +19,74 @@ except ImportError:
     from typing_extensions import TypedDict, NotRequired  # Python 3.10
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
 
+from .auth_manager import thread_authorized_http
+from .photos_cache import PhotosMetadataCache
+
+# Bytes copied at a time when streaming a download to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Default number of concurrent downloads in download_many. Downloads spend nearly
+# all their time waiting on the network, so many can be in flight at once.
+MAX_DOWNLOAD_WORKERS = 32
+
+# Connections kept open per host by the pooled session; room for every download
+# worker plus the uploads and page fetches running alongside them
+HTTP_POOL_SIZE = 64
+
+# Default number of concurrent file uploads in upload_many
+MAX_UPLOAD_WORKERS = 4
+
+# Maximum number of media items mediaItems.batchCreate accepts per call
+BATCH_CREATE_SIZE = 50
+
+# Maximum number of media items mediaItems.batchGet accepts per call
+BATCH_GET_SIZE = 50
+
+# Parts of a media item requested from the API; leaves out productUrl and
+# contributorInfo, which nothing here uses
+_MEDIA_ITEM_PARTS = 'id,filename,mimeType,baseUrl,description,mediaMetadata'
+
+# Partial response requested when listing media items
+MEDIA_ITEM_FIELDS = f'nextPageToken,mediaItems({_MEDIA_ITEM_PARTS})'
+
+# Partial response for callers that only need the IDs of media items
+MEDIA_ID_FIELDS = 'nextPageToken,mediaItems/id'
+
+# Shared stand-in for missing metadata sections; never modified
+_EMPTY: dict[str, Any] = {}
+
+UPLOAD_URL = 'https://photoslibrary.googleapis.com/v1/uploads'
+
+# Bytes sent per request in a resumable upload session
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Times an upload session is resumed after a failed chunk before giving up
+UPLOAD_RESUME_ATTEMPTS = 3
+
+# Bytes read at a time when hashing a file before upload
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Access tokens this close to expiry are refreshed before building a header
+AUTH_REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def _file_sha256(path: str | Path) -> str | None:
+    """Get the hex SHA-256 digest of a file's contents, or None if it can't be read"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+    except OSError as e:
+        logging.error("Error hashing %s: %s", path, e)
+        return None
+    return digest.hexdigest()
+
 
 class MediaMetadata(TypedDict):
     """Type definition for media item metadata"""
@@ -38,13 +107,50 @@ class MediaMetadata(TypedDict):
 class PhotosManager:
     """Manages Google Photos operations through the Photos API"""
     
-    def __init__(self, service: Resource):
+    def __init__(self, service: Resource, cache_path: str | Path | None = None):
         """Initialize the Photos Manager
         
         Args:
             service: Authenticated Google Photos API service resource
+            cache_path: Optional SQLite file for remembering listed media items, so
+                later listings only fetch items added since the previous run
         """
         self.service = service
+        self._item_cache = PhotosMetadataCache(cache_path) if cache_path else None
+        
+        # One pooled session for all media transfers, so connections to Google's
+        # media hosts are reused instead of opened per file
+        self._session = requests.Session()
+        retries = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                        respect_retry_after_header=True)
+        self._session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=HTTP_POOL_SIZE,
+                                                        max_retries=retries))
+        
+        # Authorization header shared by all uploads, with the expiry of its token
+        self._cached_auth: tuple[dict[str, str], datetime | None] | None = None
+        self._auth_lock = threading.Lock()
+        
+        self._mkdir_cache: set[str] = set()
+        
+        # Per-thread HTTP connections for API calls; see _execute
+        self._local = threading.local()
+        
+    def close(self) -> None:
+        """Close the pooled HTTP connections and the item cache"""
+        self._session.close()
+        if self._item_cache:
+            self._item_cache.close()
+        
+    def __enter__(self) -> 'PhotosManager':
+        return self
+        
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session with retries, shared by media transfers"""
+        return self._session
         
     def get_all_media_items(self) -> list[dict[str, Any]]:
         """Get all media items from Google Photos
@@ -52,134 +158,238 @@ class PhotosManager:
         Returns:
             List of media item dictionaries
         """
+        media_items = list(self.iter_all_media_items())
+        logging.info("Retrieved a total of %s media items", len(media_items))
+        return media_items
+        
+    def iter_all_media_items(self, fields: str = MEDIA_ITEM_FIELDS) -> Iterator[dict[str, Any]]:
+        """Yield all media items from Google Photos, one page at a time
+        
+        Only the current page is held in memory, so callers that process items
+        as they arrive don't need to keep the whole library.
+        
+        With a non-empty item cache, only the IDs of the library are listed. Cached
+        items that are no longer in the library are evicted, items the cache
+        doesn't have yet are fetched with mediaItems.batchGet, and everything is
+        then read from the cache.
+        
+        Args:
+            fields: Partial response to request, e.g. MEDIA_ID_FIELDS. The item cache
+                is only used with the default.
+        
+        Yields:
+            Media item dictionaries
+        """
         try:
             logging.debug("Fetching all media items from Google Photos")
-            media_items = []
-            page_token = None
-            
-            while True:
-                request_body = {
-                    'pageSize': 100  # Maximum allowed by the API
-                }
+            if not self._item_cache or fields != MEDIA_ITEM_FIELDS:
+                yield from self._paged(self.service.mediaItems().list, fields=fields)
+                return
                 
-                if page_token:
-                    request_body['pageToken'] = page_token
-                    
-                results = self.service.mediaItems().list(
-                    body=request_body
-                ).execute()
-                
-                batch_items = results.get('mediaItems', [])
-                media_items.extend(batch_items)
-                logging.debug(f"Retrieved {len(batch_items)} media items")
+            cached_ids = self._item_cache.ids()
+            if not cached_ids:
+                new_items = []
+                for item in self._paged(self.service.mediaItems().list, fields=fields):
+                    new_items.append(item)
+                    yield item
+                self._item_cache.put_many(new_items)
+                return
                 
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
-                    
-            logging.info(f"Retrieved a total of {len(media_items)} media items")
-            return media_items
-            
+            # Reconcile against a complete ID listing; a partial one raises before
+            # anything is evicted
+            library_ids = [item['id'] for item in self._paged(self.service.mediaItems().list,
+                                                              fields=MEDIA_ID_FIELDS)]
+            self._item_cache.delete_many(cached_ids.difference(library_ids))
+            missing_ids = [item_id for item_id in library_ids if item_id not in cached_ids]
+            logging.debug("Fetching %s media items missing from the cache", len(missing_ids))
+            self._item_cache.put_many(self._batch_get(missing_ids))
+            yield from self._item_cache.get_all()
         except HttpError as e:
-            logging.error(f"Error getting media items: {e}")
-            return []
+            logging.error("Error getting media items: %s", e)
+            
+    def _batch_get(self, media_item_ids: list[str]) -> list[dict[str, Any]]:
+        """Get several media items, BATCH_GET_SIZE per call
+        
+        Args:
+            media_item_ids: IDs of the media items to get
             
-    def search_media_items(self, filters: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        Returns:
+            Media item dictionaries of the items that were found
+        """
+        items = []
+        for start in range(0, len(media_item_ids), BATCH_GET_SIZE):
+            result = self._execute(self.service.mediaItems().batchGet(
+                mediaItemIds=media_item_ids[start:start + BATCH_GET_SIZE],
+                fields=f'mediaItemResults/mediaItem({_MEDIA_ITEM_PARTS})'
+            ))
+            items.extend(entry['mediaItem'] for entry in result.get('mediaItemResults', [])
+                         if 'mediaItem' in entry)
+        return items
+        
+    def search_media_items(self, filters: dict[str, Any] | None = None,
+                           fields: str = MEDIA_ITEM_FIELDS) -> list[dict[str, Any]]:
         """Search media items with optional filters
         
         Args:
             filters: Optional filters to apply to the search
+            fields: Partial response to request, e.g. MEDIA_ID_FIELDS
             
         Returns:
             List of media item dictionaries matching the filters
         """
         try:
             filter_desc = "with filters" if filters else "without filters"
-            logging.debug(f"Searching media items {filter_desc}")
+            logging.debug("Searching media items %s", filter_desc)
             
-            media_items = []
-            page_token = None
-            
-            while True:
-                request_body = {
-                    'pageSize': 100  # Maximum allowed by the API
-                }
-                
-                if filters:
-                    request_body['filters'] = filters
-                    
-                if page_token:
-                    request_body['pageToken'] = page_token
-                    
-                results = self.service.mediaItems().search(
-                    body=request_body
-                ).execute()
-                
-                batch_items = results.get('mediaItems', [])
-                media_items.extend(batch_items)
-                logging.debug(f"Retrieved {len(batch_items)} media items in search batch")
-                
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
-                    
-            logging.info(f"Search returned {len(media_items)} media items")
+            media_items = list(self._paged(self.service.mediaItems().search,
+                                           {'filters': filters} if filters else None, fields))
+            logging.info("Search returned %s media items", len(media_items))
             return media_items
             
         except HttpError as e:
-            logging.error(f"Error searching media items: {e}")
+            logging.error("Error searching media items: %s", e)
             return []
             
-    def download_media_item(self, media_item: dict[str, Any], local_path: str | Path) -> bool:
+    def _paged(self, method: Callable[..., Any], extra_body: dict[str, Any] | None = None,
+               fields: str = MEDIA_ITEM_FIELDS) -> Iterator[dict[str, Any]]:
+        """Yield the media items of every page of a paginated call
+        
+        Args:
+            method: API method that takes a request body, e.g. mediaItems().list
+            extra_body: Optional extra fields for the request body, such as filters
+            fields: Partial response to request for each page
+            
+        Yields:
+            Media item dictionaries
+        """
+        request_body = {
+            'pageSize': 100,  # Maximum allowed by the API
+            **(extra_body or {})
+        }
+        for results in self._fetch_pages(method, request_body, fields):
+            batch_items = results.get('mediaItems', [])
+            logging.debug("Retrieved %s media items", len(batch_items))
+            yield from batch_items
+            
+    def _fetch_pages(self, method: Callable[..., Any], request_body: dict[str, Any],
+                     fields: str = MEDIA_ITEM_FIELDS) -> Iterator[dict[str, Any]]:
+        """Yield each page of a paginated call, fetching the next page in the background
+        
+        Page tokens only arrive with the previous page, so requests can't be sent in
+        parallel. Instead, the request for the next page is started as soon as its
+        token is known, and runs while the caller works through the current page.
+        
+        Args:
+            method: API method that takes a request body, e.g. mediaItems().list
+            request_body: Request body for the first page
+            fields: Partial response to request for each page
+            
+        Yields:
+            API response for each page
+        """
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='photos-pages') as executor:
+            future = executor.submit(self._execute, method(body=request_body, fields=fields))
+            while future is not None:
+                results = future.result()
+                page_token = results.get('nextPageToken')
+                if page_token:
+                    future = executor.submit(self._execute, method(body={**request_body, 'pageToken': page_token},
+                                                                   fields=fields))
+                else:
+                    future = None
+                yield results
+                
+    def download_media_item(self, media_item: dict[str, Any], local_path: str | Path,
+                            force: bool = False) -> bool:
         """Download a media item from Google Photos
         
         Args:
             media_item: Media item dictionary from the Photos API
             local_path: Path where the file should be saved
+            force: Download even if a file of the same size already exists at local_path
             
         Returns:
-            True if download was successful, False otherwise
+            True if download was successful or the file was already present, False otherwise
         """
         try:
-            # Ensure directory exists
-            path = Path(local_path)
-            path.parent.mkdir(parents=True, exist_ok=True)
+            # Ensure directory exists, once per directory
+            parent = os.path.dirname(local_path)
+            if parent not in self._mkdir_cache:
+                os.makedirs(parent or '.', exist_ok=True)
+                self._mkdir_cache.add(parent)
             
             # Get media item details for logging
             item_id = media_item.get('id', 'unknown')
             filename = media_item.get('filename', 'unknown')
-            logging.debug(f"Downloading media item {item_id} ({filename}) to {local_path}")
+            logging.debug("Downloading media item %s (%s) to %s", item_id, filename, local_path)
             
-            # Get the base URL for download
+            # Get the base URL for download; cached items may have lost an expired one
             base_url = media_item.get('baseUrl')
+            if not base_url and 'id' in media_item:
+                base_url = self._execute(self.service.mediaItems().get(mediaItemId=item_id)).get('baseUrl')
             if not base_url:
-                logging.error(f"No baseUrl found for media item {item_id}")
+                logging.error("No baseUrl found for media item %s", item_id)
                 return False
                 
             # Add download parameters
-            if media_item.get('mediaMetadata', {}).get('video'):
+            if 'video' in (media_item.get('mediaMetadata') or _EMPTY):
                 # For videos, add video download parameter
                 download_url = f"{base_url}=dv"
-                logging.debug(f"Using video download URL for {item_id}")
+                logging.debug("Using video download URL for %s", item_id)
             else:
                 # For photos, add high quality download parameter
                 download_url = f"{base_url}=d"
-                logging.debug(f"Using photo download URL for {item_id}")
+                logging.debug("Using photo download URL for %s", item_id)
                 
-            # Download the file
-            response = requests.get(download_url, timeout=30)
-            response.raise_for_status()
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-                
-            logging.info(f"Media item {item_id} downloaded successfully to {local_path}")
+            # Skip the download when the local file already has the server's size
+            if not force and os.path.exists(local_path):
+                head = self._session.head(download_url, timeout=10, allow_redirects=True)
+                if head.ok and int(head.headers.get('Content-Length', -1)) == os.path.getsize(local_path):
+                    logging.debug("Skipping media item %s: already present at %s", item_id, local_path)
+                    return True
+                    
+            # Stream the file to disk in chunks instead of holding it all in memory
+            with self._session.get(download_url, stream=True, timeout=(10, 120)) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                # Read into one reused buffer rather than allocating bytes per chunk
+                buffer = bytearray(DOWNLOAD_CHUNK_SIZE)
+                view = memoryview(buffer)
+                with open(local_path, 'wb') as f:
+                    while n := response.raw.readinto(buffer):
+                        f.write(view[:n])
+                    
+            logging.info("Media item %s downloaded successfully to %s", item_id, local_path)
             return True
             
         except Exception as e:
-            logging.error(f"Error downloading media item: {e}")
+            logging.error("Error downloading media item: %s", e)
             return False
             
+    def download_many(self, pairs: list[tuple[dict[str, Any], str | Path]],
+                      max_workers: int = MAX_DOWNLOAD_WORKERS) -> list[bool]:
+        """Download several media items concurrently
+        
+        Workers share the pooled session; rate-limited responses are retried by
+        the session, which waits as long as Retry-After asks.
+        
+        Args:
+            pairs: List of (media item dictionary, local path) pairs
+            max_workers: Maximum number of downloads in flight. Defaults to 32.
+            
+        Returns:
+            List with True for each pair that downloaded successfully, in input order
+        """
+        if not pairs:
+            return []
+            
+        logging.debug("Downloading %s media items with %s workers", len(pairs), max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='photos-download') as executor:
+            results = list(executor.map(lambda pair: self.download_media_item(*pair), pairs))
+            
+        logging.info("Downloaded %s of %s media items", sum(results), len(pairs))
+        return results
+        
     def upload_media_item(self, local_path: str | Path, filename: str | None = None, description: str | None = None) -> str | None:
         """Upload a media item to Google Photos
         
@@ -191,57 +401,110 @@ class PhotosManager:
         Returns:
             Media item ID if successful, None otherwise
         """
-        try:
-            path = Path(local_path)
-            if not filename:
-                filename = path.name
-                
-            logging.debug(f"Uploading media item {local_path} as {filename}")
+        return self.upload_many([local_path], [filename], [description])[0]
+        
+    def upload_many(self, paths: list[str | Path], filenames: list[str | None] | None = None,
+                    descriptions: list[str | None] | None = None,
+                    max_workers: int = MAX_UPLOAD_WORKERS) -> list[str | None]:
+        """Upload several media items to Google Photos
+        
+        The file bytes are uploaded concurrently, then the media items are created
+        with one batchCreate call per BATCH_CREATE_SIZE uploads. With an item cache,
+        files whose contents were uploaded before are not sent again and get the
+        ID of the media item created then.
+        
+        Args:
+            paths: Paths to the local files to upload
+            filenames: Optional filename for each path. None entries use the basename.
+            descriptions: Optional description for each path. None entries use the filename.
+            max_workers: Maximum number of file uploads in flight. Defaults to 4.
             
-            # Step 1: Upload the file to get an upload token
-            upload_token = self._upload_file_for_token(local_path)
-            if not upload_token:
-                logging.error(f"Failed to get upload token for {local_path}")
-                return None
+        Returns:
+            List with the media item ID for each path, or None where it failed, in input order
+        """
+        if not paths:
+            return []
+            
+        filenames = [name or Path(path).name for path, name in zip(paths, filenames or [None] * len(paths))]
+        descriptions = [desc or name for name, desc in zip(filenames, descriptions or [None] * len(paths))]
+        logging.debug("Uploading %s media items", len(paths))
+        
+        results: list[str | None] = [None] * len(paths)
+        hashes: list[str | None] = [None] * len(paths)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='photos-upload') as executor:
+            # Skip files whose contents have been uploaded before
+            if self._item_cache:
+                hashes = list(executor.map(_file_sha256, paths))
+                for index, digest in enumerate(hashes):
+                    if digest:
+                        results[index] = self._item_cache.get_upload(digest)
+                        
+            # Step 1: Upload the files to get upload tokens
+            to_upload = [index for index, item_id in enumerate(results) if item_id is None]
+            if len(to_upload) < len(paths):
+                logging.info("Skipping %s media items uploaded before", len(paths) - len(to_upload))
+            tokens: list[str | None] = [None] * len(paths)
+            for index, token in zip(to_upload, executor.map(self._upload_file_for_token,
+                                                            [paths[index] for index in to_upload])):
+                tokens[index] = token
                 
-            logging.debug(f"Received upload token for {filename}")
+        # Step 2: Create the media items, up to BATCH_CREATE_SIZE per call
+        pending = []
+        for index in to_upload:
+            if tokens[index]:
+                pending.append(index)
+            else:
+                logging.error("Failed to get upload token for %s", paths[index])
                 
-            # Step 2: Create the media item
-            new_media_item = {
-                'description': description or filename,
-                'simpleMediaItem': {
-                    'uploadToken': upload_token,
-                    'fileName': filename
-                }
-            }
-            
+        created = []
+                
+        for start in range(0, len(pending), BATCH_CREATE_SIZE):
+            chunk = pending[start:start + BATCH_CREATE_SIZE]
             request_body = {
-                'newMediaItems': [new_media_item]
+                'newMediaItems': [
+                    {
+                        'description': descriptions[index],
+                        'simpleMediaItem': {
+                            'uploadToken': tokens[index],
+                            'fileName': filenames[index]
+                        }
+                    }
+                    for index in chunk
+                ]
             }
             
-            logging.debug(f"Creating media item with upload token")
-            result = self.service.mediaItems().batchCreate(
-                body=request_body
-            ).execute()
-            
-            new_media_items = result.get('newMediaItemResults', [])
-            if new_media_items and new_media_items[0].get('status', {}).get('message') == 'Success':
-                media_item_id = new_media_items[0].get('mediaItem', {}).get('id')
-                logging.info(f"Media item {filename} uploaded successfully with ID: {media_item_id}")
-                return media_item_id
-            else:
-                status = new_media_items[0].get('status', {}) if new_media_items else 'Unknown error'
-                logging.error(f"Upload failed: {status}")
-                return None
+            try:
+                logging.debug("Creating %s media items from upload tokens", len(chunk))
+                result = self.service.mediaItems().batchCreate(
+                    body=request_body
+                ).execute(http=self._thread_http())
+            except HttpError as e:
+                logging.error("Error uploading media items: %s", e)
+                continue
                 
-        except HttpError as e:
-            logging.error(f"Error uploading media item: {e}")
-            return None
-            
+            # Results come back in the same order as the new media items
+            for index, item_result in zip(chunk, result.get('newMediaItemResults', [])):
+                status = item_result.get('status', {})
+                if status.get('message') == 'Success':
+                    results[index] = item_result.get('mediaItem', {}).get('id')
+                    logging.info("Media item %s uploaded successfully with ID: %s", filenames[index], results[index])
+                    if hashes[index] and results[index]:
+                        created.append((hashes[index], results[index]))
+                else:
+                    logging.error("Upload of %s failed: %s", filenames[index], status)
+                    
+        if self._item_cache and created:
+            self._item_cache.put_uploads(created)
+        return results
+        
     def _upload_file_for_token(self, local_path: str | Path) -> str | None:
         """Upload a file to get an upload token
         This is the first step in the upload process
         
+        The file is sent through a resumable upload session one chunk at a time, so
+        only a chunk is held in memory and a failed chunk is resent from the offset
+        the server reports instead of restarting the whole upload.
+        
         Args:
             local_path: Path to the local file to upload
             
@@ -251,37 +514,118 @@ class PhotosManager:
         try:
             path = Path(local_path)
             file_size = path.stat().st_size
-            logging.debug(f"Uploading file for token: {path.name} ({file_size} bytes)")
-            
-            # Read the file
-            with open(local_path, 'rb') as f:
-                file_content = f.read()
-                
-            # Get upload URL
-            upload_url = 'https://photoslibrary.googleapis.com/v1/uploads'
-            
-            # Prepare headers
-            headers = {
-                'Authorization': f'Bearer {self.service._http.credentials.token}',
-                'Content-Type': 'application/octet-stream',
-                'X-Goog-Upload-File-Name': os.path.basename(str(local_path)),
-                'X-Goog-Upload-Protocol': 'raw'
-            }
-            
-            # Upload the file
-            logging.debug(f"Sending upload request for {path.name}")
-            response = requests.post(upload_url, headers=headers, data=file_content, timeout=60)
+            logging.debug("Uploading file for token: %s (%s bytes)", path.name, file_size)
+            
+            auth = self._auth_header()
+            
+            # Start an upload session
+            response = self._session.post(UPLOAD_URL, headers={
+                **auth,
+                'Content-Length': '0',
+                'X-Goog-Upload-Command': 'start',
+                'X-Goog-Upload-File-Name': path.name,
+                'X-Goog-Upload-Protocol': 'resumable',
+                'X-Goog-Upload-Raw-Size': str(file_size)
+            }, timeout=60)
             response.raise_for_status()
-            
+            session_url = response.headers['X-Goog-Upload-URL']
+            
+            # Every chunk but the last must be a multiple of the server's granularity
+            granularity = int(response.headers.get('X-Goog-Upload-Chunk-Granularity', 1))
+            chunk_size = max(granularity, UPLOAD_CHUNK_SIZE // granularity * granularity)
+            
+            offset = 0
+            failures = 0
+            with open(path, 'rb') as f:
+                while True:
+                    f.seek(offset)
+                    chunk = f.read(chunk_size)
+                    last = offset + len(chunk) >= file_size
+                    headers = {
+                        **auth,
+                        'X-Goog-Upload-Command': 'upload, finalize' if last else 'upload',
+                        'X-Goog-Upload-Offset': str(offset)
+                    }
+                    
+                    try:
+                        response = self._session.post(session_url, headers=headers, data=chunk, timeout=120)
+                        response.raise_for_status()
+                    except requests.RequestException as e:
+                        failures += 1
+                        if failures > UPLOAD_RESUME_ATTEMPTS:
+                            raise
+                        logging.warning("Upload of %s interrupted at byte %s, resuming: %s", path.name, offset, e)
+                        offset = self._query_upload_offset(session_url, auth)
+                        continue
+                        
+                    if last:
+                        break
+                    offset += len(chunk)
+                    
             # The response body is the upload token
             token = response.text
-            logging.debug(f"Received upload token for {path.name}")
+            logging.debug("Received upload token for %s", path.name)
             return token
             
         except Exception as e:
-            logging.error(f"Error uploading file for token: {e}")
+            logging.error("Error uploading file for token: %s", e)
             return None
             
+    def _thread_http(self) -> Any:
+        """Get the calling thread's own authorized HTTP connection, or None for the default
+        
+        Transfers run on several threads at once, and the service's own httplib2
+        connection must not be shared between them.
+        """
+        return thread_authorized_http(self.service, self._local)
+        
+    def _execute(self, request: Any) -> Any:
+        """Execute an API request on the calling thread's own HTTP connection"""
+        return request.execute(http=self._thread_http())
+        
+    def _auth_header(self) -> dict[str, str]:
+        """Get the Authorization header for direct requests to the Photos API
+        
+        The header is built once and reused until its token is within
+        AUTH_REFRESH_MARGIN of expiring; the credentials are then refreshed once,
+        even when many uploads ask at the same time.
+        
+        Returns:
+            Header dictionary with the bearer token
+        """
+        with self._auth_lock:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)  # google-auth uses naive UTC
+            if self._cached_auth:
+                header, expiry = self._cached_auth
+                if expiry is None or expiry - now >= AUTH_REFRESH_MARGIN:
+                    return header
+                    
+            creds = self.service._http.credentials
+            expiry = getattr(creds, 'expiry', None)
+            if expiry and expiry - now < AUTH_REFRESH_MARGIN:
+                from google.auth.transport.requests import Request
+                logging.debug("Refreshing access token for Photos uploads")
+                creds.refresh(Request())
+                expiry = creds.expiry
+                
+            header = {'Authorization': f'Bearer {creds.token}'}
+            self._cached_auth = (header, expiry)
+            return header
+            
+    def _query_upload_offset(self, session_url: str, auth: dict[str, str]) -> int:
+        """Ask the server how many bytes of an upload session it has received
+        
+        Args:
+            session_url: URL of the upload session
+            auth: Authorization header
+            
+        Returns:
+            Offset to continue the upload from
+        """
+        response = self._session.post(session_url, headers={**auth, 'X-Goog-Upload-Command': 'query'}, timeout=60)
+        response.raise_for_status()
+        return int(response.headers['X-Goog-Upload-Size-Received'])
+        
     def get_media_item_info(self, media_item_id: str) -> dict[str, Any] | None:
         """Get detailed information about a media item
         
@@ -292,13 +636,13 @@ class PhotosManager:
             Dictionary with media item information if successful, None otherwise
         """
         try:
-            logging.debug(f"Getting info for media item: {media_item_id}")
+            logging.debug("Getting info for media item: %s", media_item_id)
             result = self.service.mediaItems().get(
                 mediaItemId=media_item_id
-            ).execute()
+            ).execute(http=self._thread_http())
             return result
         except HttpError as e:
-            logging.error(f"Error getting media item info: {e}")
+            logging.error("Error getting media item info: %s", e)
             return None
             
     def create_album(self, title: str, description: str | None = None) -> str | None:
@@ -312,7 +656,7 @@ class PhotosManager:
             Album ID if successful, None otherwise
         """
         try:
-            logging.debug(f"Creating album: {title}")
+            logging.debug("Creating album: %s", title)
             
             request_body = {
                 'album': {
@@ -325,18 +669,18 @@ class PhotosManager:
                 
             result = self.service.albums().create(
                 body=request_body
-            ).execute()
+            ).execute(http=self._thread_http())
             
             album_id = result.get('id')
             if album_id:
-                logging.info(f"Album {title} created successfully with ID: {album_id}")
+                logging.info("Album %s created successfully with ID: %s", title, album_id)
             else:
-                logging.error(f"Failed to create album {title}")
+                logging.error("Failed to create album %s", title)
                 
             return album_id
             
         except HttpError as e:
-            logging.error(f"Error creating album: {e}")
+            logging.error("Error creating album: %s", e)
             return None
             
     def add_media_to_album(self, album_id: str, media_item_ids: list[str]) -> bool:
@@ -350,7 +694,7 @@ class PhotosManager:
             True if successful, False otherwise
         """
         try:
-            logging.debug(f"Adding {len(media_item_ids)} media items to album {album_id}")
+            logging.debug("Adding %s media items to album %s", len(media_item_ids), album_id)
             
             request_body = {
                 'mediaItemIds': media_item_ids
@@ -359,13 +703,13 @@ class PhotosManager:
             self.service.albums().batchAddMediaItems(
                 albumId=album_id,
                 body=request_body
-            ).execute()
+            ).execute(http=self._thread_http())
             
-            logging.info(f"Added {len(media_item_ids)} media items to album {album_id}")
+            logging.info("Added %s media items to album %s", len(media_item_ids), album_id)
             return True
             
         except HttpError as e:
-            logging.error(f"Error adding media to album: {e}")
+            logging.error("Error adding media to album: %s", e)
             return False
             
     def parse_media_metadata(self, media_item):
@@ -373,33 +717,37 @@ class PhotosManager:
         Parse media metadata from a media item
         Returns a dictionary with useful metadata
         """
+        # Bind the lookups once; this runs for every item in the library
+        get = media_item.get
+        mm = get('mediaMetadata') or _EMPTY
+        mm_get = mm.get
         metadata = {
-            'id': media_item.get('id'),
-            'filename': media_item.get('filename'),
-            'description': media_item.get('description', ''),
-            'creation_time': media_item.get('mediaMetadata', {}).get('creationTime'),
-            'width': media_item.get('mediaMetadata', {}).get('width'),
-            'height': media_item.get('mediaMetadata', {}).get('height'),
-            'mime_type': media_item.get('mimeType'),
-            'base_url': media_item.get('baseUrl'),
-            'is_video': 'video' in media_item.get('mediaMetadata', {}),
-            'is_photo': 'photo' in media_item.get('mediaMetadata', {})
+            'id': get('id'),
+            'filename': get('filename'),
+            'description': get('description', ''),
+            'creation_time': mm_get('creationTime'),
+            'width': mm_get('width'),
+            'height': mm_get('height'),
+            'mime_type': get('mimeType'),
+            'base_url': get('baseUrl'),
+            'is_video': 'video' in mm,
+            'is_photo': 'photo' in mm
         }
         
         # Add video-specific metadata
         if metadata['is_video']:
-            video_metadata = media_item.get('mediaMetadata', {}).get('video', {})
-            metadata['fps'] = video_metadata.get('fps')
-            metadata['status'] = video_metadata.get('status')
+            video_get = (mm_get('video') or _EMPTY).get
+            metadata['fps'] = video_get('fps')
+            metadata['status'] = video_get('status')
             
         # Add photo-specific metadata
         if metadata['is_photo']:
-            photo_metadata = media_item.get('mediaMetadata', {}).get('photo', {})
-            metadata['camera_make'] = photo_metadata.get('cameraMake')
-            metadata['camera_model'] = photo_metadata.get('cameraModel')
-            metadata['focal_length'] = photo_metadata.get('focalLength')
-            metadata['aperture_f_number'] = photo_metadata.get('apertureFNumber')
-            metadata['iso_equivalent'] = photo_metadata.get('isoEquivalent')
-            metadata['exposure_time'] = photo_metadata.get('exposureTime')
+            photo_get = (mm_get('photo') or _EMPTY).get
+            metadata['camera_make'] = photo_get('cameraMake')
+            metadata['camera_model'] = photo_get('cameraModel')
+            metadata['focal_length'] = photo_get('focalLength')
+            metadata['aperture_f_number'] = photo_get('apertureFNumber')
+            metadata['iso_equivalent'] = photo_get('isoEquivalent')
+            metadata['exposure_time'] = photo_get('exposureTime')
             
         return metadata
\ No newline at end of file
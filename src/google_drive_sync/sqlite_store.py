@@ -0,0 +1,50 @@
+"""
+SQLite Store
+Connection handling shared by the local metadata caches
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+# Rows written per transaction when storing many rows at once
+WRITE_BATCH_SIZE = 500
+
+
+class SQLiteStore:
+    """SQLite database shared between threads, serialised by a lock"""
+
+    def __init__(self, path: str | Path, schema: str):
+        """Open (or create) the database
+
+        Args:
+            path: Path of the SQLite database file
+            schema: Script creating the tables if they don't exist yet
+        """
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(schema)
+
+    def _write_many(self, sql: str, rows: list[tuple]) -> None:
+        """Run a statement for many rows, committing every WRITE_BATCH_SIZE rows
+
+        Args:
+            sql: Statement to run
+            rows: Parameters for each execution
+        """
+        with self._lock:
+            for start in range(0, len(rows), WRITE_BATCH_SIZE):
+                self._conn.execute("begin")
+                try:
+                    self._conn.executemany(sql, rows[start:start + WRITE_BATCH_SIZE])
+                except sqlite3.Error:
+                    self._conn.execute("rollback")
+                    raise
+                self._conn.execute("commit")
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
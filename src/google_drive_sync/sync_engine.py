@@ -4,16 +4,22 @@ import hashlib
 import logging
 import os
 import tempfile
+import threading
 import time
-from collections import defaultdict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from enum import Enum, auto
 from pathlib import Path
 from typing import Any, Callable
 
 from .drive_manager import DriveManager
 from .photos_manager import PhotosManager
-from .conflict_resolver import ConflictResolver, ConflictResolution
+from .conflict_resolver import ConflictResolver, parse_iso_datetime
+
+# Default number of uploads and downloads run at once by _perform_sync_operations
+MAX_SYNC_WORKERS = 4
+
+# Drive fields the comparison and conflict dialog rely on
+DRIVE_LIST_FIELDS = "nextPageToken, files(id, name, size, createdTime, modifiedTime, mimeType, thumbnailLink)"
 
 
 class SyncResult(Enum):
@@ -28,7 +34,8 @@ class SyncEngine:
     """Main synchronization engine between Google Drive and Google Photos"""
     
     def __init__(self, drive_manager: DriveManager, photos_manager: PhotosManager, 
-                 conflict_resolver: ConflictResolver, drive_folder_id: str):
+                 conflict_resolver: ConflictResolver, drive_folder_id: str,
+                 max_workers: int = MAX_SYNC_WORKERS):
         """Initialize the sync engine
         
         Args:
@@ -36,12 +43,16 @@ class SyncEngine:
             photos_manager: Google Photos manager instance
             conflict_resolver: Conflict resolver instance
             drive_folder_id: ID of the Google Drive folder to sync
+            max_workers: Maximum number of files transferred at once. Defaults to 4.
         """
         self.drive_manager = drive_manager
         self.photos_manager = photos_manager
         self.conflict_resolver = conflict_resolver
         self.drive_folder_id = drive_folder_id
-        self.stop_requested = False
+        self.max_workers = max_workers
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._temp_dir: str | None = None
         
         self.stats = {
             'drive_to_photos_uploads': 0,
@@ -50,17 +61,35 @@ class SyncEngine:
             'errors': 0
         }
         
+    @property
+    def stop_requested(self) -> bool:
+        """Whether the current sync has been asked to stop"""
+        return self._stop_event.is_set()
+        
+    @stop_requested.setter
+    def stop_requested(self, value: bool) -> None:
+        if value:
+            self._stop_event.set()
+        else:
+            self._stop_event.clear()
+        
     def start_sync(self, progress_callback: Callable[[int], None] | None = None, 
                  status_callback: Callable[[str], None] | None = None, 
-                 log_callback: Callable[[str], None] | None = None) -> None:
+                 log_callback: Callable[[str], None] | None = None,
+                 cancel_event: threading.Event | None = None) -> None:
         """Start the synchronization process between Google Drive and Google Photos
         
         Args:
             progress_callback: Callback function to report progress percentage (0-100)
             status_callback: Callback function to report current status message
             log_callback: Callback function to report detailed log messages
+            cancel_event: Optional event owned by the caller; setting it stops the sync.
+                The caller is responsible for clearing it before starting.
         """
-        self.stop_requested = False
+        if cancel_event is not None:
+            self._stop_event = cancel_event
+        else:
+            self._stop_event.clear()
         self.stats = {
             'drive_to_photos_uploads': 0,
             'photos_to_drive_downloads': 0,
@@ -80,33 +109,48 @@ class SyncEngine:
             if progress_callback:
                 progress_callback(10)
                 
-            logging.info(f"Scanning Google Drive folder: {self.drive_folder_id}")
-            drive_files = self.drive_manager.get_folder_contents(self.drive_folder_id, recursive=True)
-            drive_media_files = [f for f in drive_files if self.drive_manager.is_media_file(f)]
+            # The Photos library is listed on a worker thread while Drive is scanned
+            # here, so the two network-bound scans overlap
+            scan_done = threading.Event()
+            scan_executor = ThreadPoolExecutor(max_workers=1)
+            photos_future = scan_executor.submit(self._scan_photos, scan_done)
+            scan_executor.shutdown(wait=False)
             
-            if log_callback:
-                log_callback(f"Found {len(drive_media_files)} media files in Google Drive")
-                
-            logging.info(f"Found {len(drive_media_files)} media files in Google Drive")
-                
-            if self.stop_requested:
-                logging.info("Sync stopped during Drive scanning")
-                return
+            try:
+                # Bring the Drive metadata cache up to date before anything reads from it
+                self.drive_manager.sync_changes()
                 
-            if status_callback:
-                status_callback("Scanning Google Photos...")
+                logging.info("Scanning Google Drive folder: %s", self.drive_folder_id)
+                drive_files = self.drive_manager.get_tree_contents(self.drive_folder_id, fields=DRIVE_LIST_FIELDS)
+                drive_media_files = [f for f in drive_files if self.drive_manager.is_media_file(f)]
                 
-            if progress_callback:
-                progress_callback(20)
-                
-            logging.info("Scanning Google Photos library")
-            photos_items = self.photos_manager.get_all_media_items()
-            photos_metadata = [self.photos_manager.parse_media_metadata(item) for item in photos_items]
-            
+                if log_callback:
+                    log_callback(f"Found {len(drive_media_files)} media files in Google Drive")
+                    
+                logging.info("Found %s media files in Google Drive", len(drive_media_files))
+                    
+                if self.stop_requested:
+                    logging.info("Sync stopped during Drive scanning")
+                    return
+                    
+                if status_callback:
+                    status_callback("Scanning Google Photos...")
+                    
+                if progress_callback:
+                    progress_callback(20)
+                    
+                logging.info("Scanning Google Photos library")
+                photos_metadata = photos_future.result()
+            finally:
+                # However the scan phase ends, the Photos scan must not outlive it
+                scan_done.set()
+                if not photos_future.cancel():
+                    wait([photos_future])
+                    
             if log_callback:
                 log_callback(f"Found {len(photos_metadata)} media items in Google Photos")
                 
-            logging.info(f"Found {len(photos_metadata)} media items in Google Photos")
+            logging.info("Found %s media items in Google Photos", len(photos_metadata))
                 
             if self.stop_requested:
                 logging.info("Sync stopped during Photos scanning")
@@ -131,7 +175,7 @@ class SyncEngine:
                 if log_callback:
                     log_callback(f"Found {len(comparison_result['conflicts'])} potential conflicts to resolve")
                     
-                logging.info(f"Resolving {len(comparison_result['conflicts'])} conflicts")
+                logging.info("Resolving %s conflicts", len(comparison_result['conflicts']))
                 resolved_conflicts = self._resolve_conflicts(comparison_result['conflicts'], log_callback)
                 
                 self._update_comparison_with_resolved_conflicts(comparison_result, resolved_conflicts)
@@ -149,15 +193,37 @@ class SyncEngine:
                 log_callback("Synchronization completed successfully!")
                 
             logging.info("Synchronization completed successfully")
-            logging.info(f"Stats: {self.stats}")
+            logging.info("Stats: %s", self.stats)
                 
         except Exception as e:
             self.stats['errors'] += 1
-            logging.error(f"Synchronization failed: {str(e)}", exc_info=True)
+            logging.error("Synchronization failed: %s", e, exc_info=True)
             if log_callback:
                 log_callback(f"Synchronization failed: {str(e)}")
             raise
             
+    def _scan_photos(self, done: threading.Event) -> list[dict[str, Any]]:
+        """List the Photos library and parse the metadata of each item
+        
+        Items are parsed page by page as they arrive, so the raw API responses
+        aren't all held alongside the parsed metadata.
+        
+        Args:
+            done: Set once the sync no longer needs the scan; listing stops early
+                when it or a stop request is seen
+        
+        Returns:
+            List of Google Photos metadata dictionaries
+        """
+        parse = self.photos_manager.parse_media_metadata
+        photos_metadata = []
+        for item in self.photos_manager.iter_all_media_items():
+            if done.is_set() or self.stop_requested:
+                logging.debug("Photos scan abandoned after %s items", len(photos_metadata))
+                break
+            photos_metadata.append(parse(item))
+        return photos_metadata
+        
     def stop_sync(self) -> None:
         """Stop the synchronization process"""
         self.stop_requested = True
@@ -185,63 +251,70 @@ class SyncEngine:
             'conflicts': []
         }
         
-        drive_by_name_size: dict[tuple[str, int], list[dict[str, Any]]] = defaultdict(list)
-        photos_by_name_size: dict[tuple[str, int], list[dict[str, Any]]] = defaultdict(list)
-        
-        logging.debug("Indexing Drive files by name and size")
-        for drive_file in drive_files:
-            name = drive_file.get('name', '').lower()
-            size = int(drive_file.get('size', 0))
-            key = (name, size)
-            drive_by_name_size[key].append(drive_file)
+        if not drive_files or not photos_metadata:
+            # Nothing can match, so skip building the index
+            result['drive_only'] = list(drive_files)
+            result['photos_only'] = list(photos_metadata)
+            self._report_comparison(result, log_callback)
+            return result
             
-        logging.debug("Indexing Photos files by name")
+        # Hash join on the lowercased name: index Photos once, then probe it with
+        # each Drive file in a single pass. Matched items are popped from the index,
+        # so whatever is left (plus items shadowed by a later one of the same name)
+        # is only in Photos.
+        photos_names = {}
+        shadowed_photos_items = []
         for photos_item in photos_metadata:
             name = photos_item.get('filename', '').lower()
-            key = (name, 0)
-            photos_by_name_size[key].append(photos_item)
-            
-        logging.debug(f"Indexed {len(drive_by_name_size)} unique Drive files and {len(photos_by_name_size)} unique Photos files")
-            
-        processed_drive_files = set()
-        processed_photos_items = set()
-        
-        drive_names = {f.get('name', '').lower(): f for f in drive_files}
-        photos_names = {p.get('filename', '').lower(): p for p in photos_metadata}
-        
-        logging.debug("Performing first pass comparison: exact name matches")
-        for name in drive_names:
             if name in photos_names:
-                drive_file = drive_names[name]
-                photos_item = photos_names[name]
-                
-                if self._are_dates_similar(drive_file, photos_item):
-                    result['matches'].append({
-                        'drive_file': drive_file,
-                        'photos_item': photos_item
-                    })
-                    logging.debug(f"Match found: {name}")
-                else:
-                    result['conflicts'].append({
-                        'drive_file': drive_file,
-                        'photos_item': photos_item
-                    })
-                    logging.debug(f"Conflict found: {name} (different dates)")
-                    
-                processed_drive_files.add(drive_file['id'])
-                processed_photos_items.add(photos_item['id'])
-                
-        logging.debug("Performing second pass: finding unmatched files")
+                shadowed_photos_items.append(photos_names[name])
+            photos_names[name] = photos_item
+        logging.debug("Indexed %s unique Photos names", len(photos_names))
+        
+        logging.debug("Matching Drive files against Photos items by name")
         for drive_file in drive_files:
-            if drive_file['id'] not in processed_drive_files:
+            name = drive_file.get('name', '').lower()
+            photos_item = photos_names.pop(name, None)
+            
+            if photos_item is None:
                 result['drive_only'].append(drive_file)
-                logging.debug(f"Drive-only file found: {drive_file.get('name', 'Unknown')}")
+                logging.debug("Drive-only file found: %s", drive_file.get('name', 'Unknown'))
+                continue
                 
-        for photos_item in photos_metadata:
-            if photos_item['id'] not in processed_photos_items:
-                result['photos_only'].append(photos_item)
-                logging.debug(f"Photos-only file found: {photos_item.get('filename', 'Unknown')}")
+            # Identical timestamp strings match without parsing either date
+            created = drive_file.get('createdTime')
+            if created and created == photos_item.get('creation_time'):
+                similar = True
+            else:
+                similar = self._are_dates_similar(drive_file, photos_item)
                 
+            if similar:
+                result['matches'].append({
+                    'drive_file': drive_file,
+                    'photos_item': photos_item
+                })
+                logging.debug("Match found: %s", name)
+            else:
+                result['conflicts'].append({
+                    'drive_file': drive_file,
+                    'photos_item': photos_item
+                })
+                logging.debug("Conflict found: %s (different dates)", name)
+                
+        result['photos_only'] = shadowed_photos_items + list(photos_names.values())
+        logging.debug("Found %s Photos-only items", len(result['photos_only']))
+                
+        self._report_comparison(result, log_callback)
+        return result
+        
+    def _report_comparison(self, result: dict[str, list],
+                           log_callback: Callable[[str], None] | None = None) -> None:
+        """Log the number of files in each comparison category
+        
+        Args:
+            result: Comparison result from _compare_files
+            log_callback: Optional callback for logging progress
+        """
         if log_callback:
             log_callback(f"Comparison results:")
             log_callback(f"  - Perfect matches: {len(result['matches'])}")
@@ -249,10 +322,9 @@ class SyncEngine:
             log_callback(f"  - Photos only: {len(result['photos_only'])}")
             log_callback(f"  - Conflicts: {len(result['conflicts'])}")
             
-        logging.info(f"Comparison results: {len(result['matches'])} matches, {len(result['drive_only'])} Drive-only, "
-                    f"{len(result['photos_only'])} Photos-only, {len(result['conflicts'])} conflicts")
-            
-        return result
+        logging.info("Comparison results: %s matches, %s Drive-only, %s Photos-only, %s conflicts",
+                     len(result['matches']), len(result['drive_only']), len(result['photos_only']),
+                     len(result['conflicts']))
         
     def _are_dates_similar(self, drive_file: dict[str, Any], photos_item: dict[str, Any], 
                           tolerance_hours: int = 24) -> bool:
@@ -266,26 +338,18 @@ class SyncEngine:
         Returns:
             True if dates are within tolerance, False otherwise
         """
-        try:
-            drive_date_str = drive_file.get('createdTime', '')
-            photos_date_str = photos_item.get('creation_time', '')
-            
-            if not drive_date_str or not photos_date_str:
-                logging.debug("Missing date information for comparison")
-                return False
-                
-            drive_date = datetime.fromisoformat(drive_date_str.replace('Z', '+00:00'))
-            photos_date = datetime.fromisoformat(photos_date_str.replace('Z', '+00:00'))
-            
-            diff = abs((drive_date - photos_date).total_seconds()) / 3600
-            
-            logging.debug(f"Date comparison: Drive={drive_date}, Photos={photos_date}, Diff={diff:.2f} hours")
-            return diff <= tolerance_hours
-            
-        except (ValueError, TypeError) as e:
-            logging.error(f"Error comparing dates: {e}")
+        drive_time = parse_iso_datetime(drive_file.get('createdTime'))
+        photos_time = parse_iso_datetime(photos_item.get('creation_time'))
+        
+        if drive_time is None or photos_time is None:
+            logging.debug("Missing date information for comparison")
             return False
             
+        diff = abs(drive_time.timestamp() - photos_time.timestamp())
+        
+        logging.debug("Date comparison: Drive=%s, Photos=%s, Diff=%ss", drive_time, photos_time, diff)
+        return diff <= tolerance_hours * 3600
+        
     def _resolve_conflicts(self, conflicts: list[dict[str, Any]], 
                           log_callback: Callable[[str], None] | None = None) -> list[dict[str, Any]]:
         """Resolve conflicts by asking user
@@ -297,10 +361,16 @@ class SyncEngine:
         Returns:
             List of resolved conflicts with resolution decisions
         """
-        resolved = []
+        resolved, conflicts = self.conflict_resolver.auto_resolve_batch(conflicts)
+        self.stats['conflicts_resolved'] += len(resolved)
+        if resolved:
+            if log_callback:
+                log_callback(f"Automatically resolved {len(resolved)} conflicts as the same file")
+            logging.info("Automatically resolved %s conflicts as the same file", len(resolved))
         
+        stop_requested = self._stop_event.is_set
         for conflict in conflicts:
-            if self.stop_requested:
+            if stop_requested():
                 logging.info("Conflict resolution interrupted by stop request")
                 break
                 
@@ -310,7 +380,7 @@ class SyncEngine:
             if log_callback:
                 log_callback(f"Resolving conflict for: {drive_file.get('name', 'Unknown')}")
                 
-            logging.info(f"Resolving conflict for: {drive_file.get('name', 'Unknown')}")
+            logging.info("Resolving conflict for: %s", drive_file.get('name', 'Unknown'))
                 
             resolution = self.conflict_resolver.resolve_conflict(drive_file, photos_item)
             
@@ -320,10 +390,10 @@ class SyncEngine:
                 'resolution': resolution
             })
             
-            logging.info(f"Conflict for {drive_file.get('name', 'Unknown')} resolved as: {resolution}")
+            logging.info("Conflict for %s resolved as: %s", drive_file.get('name', 'Unknown'), resolution)
             self.stats['conflicts_resolved'] += 1
             
-            if resolution == ConflictResolution.CANCEL:
+            if resolution == 'cancel':
                 if log_callback:
                     log_callback("Sync cancelled by user")
                 logging.info("Sync cancelled by user during conflict resolution")
@@ -343,16 +413,16 @@ class SyncEngine:
         comparison_result['conflicts'] = []
         
         for resolved in resolved_conflicts:
-            if resolved['resolution'] == ConflictResolution.SAME:
+            if resolved['resolution'] == 'same':
                 comparison_result['matches'].append({
                     'drive_file': resolved['drive_file'],
                     'photos_item': resolved['photos_item']
                 })
-                logging.debug(f"Conflict resolved as SAME: {resolved['drive_file'].get('name', 'Unknown')}")
-            elif resolved['resolution'] == ConflictResolution.DIFFERENT:
+                logging.debug("Conflict resolved as SAME: %s", resolved['drive_file'].get('name', 'Unknown'))
+            elif resolved['resolution'] == 'different':
                 comparison_result['drive_only'].append(resolved['drive_file'])
                 comparison_result['photos_only'].append(resolved['photos_item'])
-                logging.debug(f"Conflict resolved as DIFFERENT: {resolved['drive_file'].get('name', 'Unknown')}")
+                logging.debug("Conflict resolved as DIFFERENT: %s", resolved['drive_file'].get('name', 'Unknown'))
                 
     def _perform_sync_operations(self, comparison_result: dict[str, list], 
                                 progress_callback: Callable[[int], None] | None = None, 
@@ -376,64 +446,97 @@ class SyncEngine:
                 progress_callback(100)
             return
             
-        logging.info(f"Performing {total_operations} sync operations")
-        completed_operations = 0
+        logging.info("Performing %s sync operations", total_operations)
+        # Transfers stage files in one directory for the whole run, removed with
+        # anything a failed transfer left behind
+        with tempfile.TemporaryDirectory(prefix='drive-photos-sync-') as temp_dir:
+            self._temp_dir = temp_dir
+            try:
+                completed_operations = 0
         
-        for drive_file in comparison_result['drive_only']:
-            if self.stop_requested:
-                logging.info("Sync operations interrupted by stop request")
-                break
-                
-            if status_callback:
-                status_callback(f"Uploading {drive_file['name']} to Google Photos...")
-                
-            if log_callback:
-                log_callback(f"Uploading to Photos: {drive_file['name']}")
-                
-            success = self._upload_drive_file_to_photos(drive_file, log_callback)
-            
-            if success:
-                self.stats['drive_to_photos_uploads'] += 1
-            else:
-                self.stats['errors'] += 1
-                
-            completed_operations += 1
-            if progress_callback:
-                progress = 50 + (completed_operations / total_operations) * 50
-                progress_callback(int(progress))
-                
-            if not success and log_callback:
-                log_callback(f"Failed to upload: {drive_file['name']}")
-                
-        for photos_item in comparison_result['photos_only']:
-            if self.stop_requested:
-                logging.info("Sync operations interrupted by stop request")
-                break
-                
-            if status_callback:
-                status_callback(f"Downloading {photos_item['filename']} from Google Photos...")
-                
-            if log_callback:
-                log_callback(f"Downloading from Photos: {photos_item['filename']}")
-                
-            success = self._download_photos_item_to_drive(photos_item, log_callback)
-            
-            if success:
-                self.stats['photos_to_drive_downloads'] += 1
-            else:
-                self.stats['errors'] += 1
-                
-            completed_operations += 1
-            if progress_callback:
-                progress = 50 + (completed_operations / total_operations) * 50
-                progress_callback(int(progress))
-                
-            if not success and log_callback:
-                log_callback(f"Failed to download: {photos_item['filename']}")
+                if comparison_result['drive_only'] and not self.stop_requested:
+                    if status_callback:
+                        status_callback(f"Uploading {len(comparison_result['drive_only'])} files to Google Photos...")
+                    completed_operations = self._run_parallel(
+                        comparison_result['drive_only'], self._upload_drive_file_to_photos, 'name',
+                        'drive_to_photos_uploads', 'upload', completed_operations, total_operations,
+                        progress_callback, log_callback)
+                
+                if comparison_result['photos_only'] and not self.stop_requested:
+                    if status_callback:
+                        status_callback(f"Downloading {len(comparison_result['photos_only'])} items from Google Photos...")
+                    completed_operations = self._run_parallel(
+                        comparison_result['photos_only'], self._download_photos_item_to_drive, 'filename',
+                        'photos_to_drive_downloads', 'download', completed_operations, total_operations,
+                        progress_callback, log_callback)
+            finally:
+                self._temp_dir = None
                 
         if progress_callback:
             progress_callback(100)
             
+    def _run_parallel(self, items: list[dict[str, Any]], operation: Callable[..., bool], name_key: str,
+                      stat_key: str, action: str, completed: int, total: int,
+                      progress_callback: Callable[[int], None] | None = None,
+                      log_callback: Callable[[str], None] | None = None) -> int:
+        """Run a transfer for each item, up to max_workers at a time
+        
+        Stats and progress are updated on the calling thread as transfers finish;
+        progress is only reported when its whole percentage changes.
+        Transfers that haven't started when a stop is requested are cancelled.
+        
+        Args:
+            items: Drive files or Photos items to transfer
+            operation: Transfer method taking an item and the log callback
+            name_key: Key holding the item's display name
+            stat_key: Stats counter to increment for each successful transfer
+            action: Verb used in failure messages, e.g. 'upload'
+            completed: Number of operations completed before this call
+            total: Total number of operations in the sync
+            progress_callback: Optional callback for reporting progress
+            log_callback: Optional callback for detailed logging
+            
+        Returns:
+            Number of operations completed, including those before this call
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sync') as executor:
+            futures = {executor.submit(operation, item, log_callback): item for item in items}
+            stop_requested = self._stop_event.is_set
+            last_percent = -1
+            for future in as_completed(futures):
+                item = futures[future]
+                success = future.result()
+                with self._stats_lock:
+                    self.stats[stat_key if success else 'errors'] += 1
+                    
+                if not success and log_callback:
+                    log_callback(f"Failed to {action}: {item[name_key]}")
+                    
+                completed += 1
+                percent = 50 + completed * 50 // total
+                if progress_callback and percent != last_percent:
+                    progress_callback(percent)
+                    last_percent = percent
+                    
+                if stop_requested():
+                    logging.info("Sync operations interrupted by stop request")
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+                    
+        return completed
+        
+    def _temp_path(self, item_id: str, name: str) -> str:
+        """Get the path to stage a transferred file at
+        
+        Args:
+            item_id: ID of the Drive file or Photos item being transferred
+            name: Name of the file, whose extension is kept
+            
+        Returns:
+            Path inside the run's temp directory, or the system one outside a run
+        """
+        return os.path.join(self._temp_dir or tempfile.gettempdir(), item_id + os.path.splitext(name)[1])
+        
     def _upload_drive_file_to_photos(self, drive_file: dict[str, Any], 
                                     log_callback: Callable[[str], None] | None = None) -> bool:
         """Upload a Drive file to Google Photos
@@ -445,32 +548,33 @@ class SyncEngine:
         Returns:
             True if successful, False otherwise
         """
+        if log_callback:
+            log_callback(f"Uploading to Photos: {drive_file['name']}")
+            
+        temp_path = self._temp_path(drive_file['id'], drive_file['name'])
         try:
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_path = temp_file.name
-                
             success = self.drive_manager.download_file(drive_file['id'], temp_path)
             if not success:
-                logging.error(f"Failed to download file from Drive: {drive_file['name']}")
+                logging.error("Failed to download file from Drive: %s", drive_file['name'])
                 return False
                 
-            upload_result = self.photos_manager.upload_media_item(temp_path)
-            
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
+            upload_result = self.photos_manager.upload_media_item(temp_path, drive_file['name'])
                 
             if upload_result:
-                logging.info(f"Successfully uploaded {drive_file['name']} to Photos")
+                logging.info("Successfully uploaded %s to Photos", drive_file['name'])
                 return True
             else:
-                logging.error(f"Failed to upload {drive_file['name']} to Photos")
+                logging.error("Failed to upload %s to Photos", drive_file['name'])
                 return False
                 
         except Exception as e:
-            logging.error(f"Error uploading {drive_file['name']} to Photos: {e}")
+            logging.error("Error uploading %s to Photos: %s", drive_file['name'], e)
             return False
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
             
     def _download_photos_item_to_drive(self, photos_item: dict[str, Any], 
                                       log_callback: Callable[[str], None] | None = None) -> bool:
@@ -483,13 +587,22 @@ class SyncEngine:
         Returns:
             True if successful, False otherwise
         """
+        if log_callback:
+            log_callback(f"Downloading from Photos: {photos_item['filename']}")
+            
+        temp_path = self._temp_path(photos_item['id'], photos_item['filename'])
         try:
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-            success = self.photos_manager.download_media_item(photos_item['id'], temp_path)
+            # download_media_item takes a media item in the API's shape, and a
+            # leftover temp file must not be mistaken for an existing download
+            media_item = {
+                'id': photos_item['id'],
+                'filename': photos_item['filename'],
+                'baseUrl': photos_item.get('base_url'),
+                'mediaMetadata': {'video': {}} if photos_item.get('is_video') else {'photo': {}}
+            }
+            success = self.photos_manager.download_media_item(media_item, temp_path, force=True)
             if not success:
-                logging.error(f"Failed to download item from Photos: {photos_item['filename']}")
+                logging.error("Failed to download item from Photos: %s", photos_item['filename'])
                 return False
                 
             upload_result = self.drive_manager.upload_file(
@@ -497,19 +610,19 @@ class SyncEngine:
                 photos_item['filename'], 
                 self.drive_folder_id
             )
-            
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
                 
             if upload_result:
-                logging.info(f"Successfully downloaded {photos_item['filename']} to Drive")
+                logging.info("Successfully downloaded %s to Drive", photos_item['filename'])
                 return True
             else:
-                logging.error(f"Failed to upload {photos_item['filename']} to Drive")
+                logging.error("Failed to upload %s to Drive", photos_item['filename'])
                 return False
                 
         except Exception as e:
-            logging.error(f"Error downloading {photos_item['filename']} to Drive: {e}")
+            logging.error("Error downloading %s to Drive: %s", photos_item['filename'], e)
             return False
+        finally:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
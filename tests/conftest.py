@@ -1,120 +1,156 @@
-import pytest
+from types import MappingProxyType
 
-from google_drive_sync.drive_manager import DriveManager
+import pytest
 
 
 class _ExecWrapper:
+    __slots__ = ("_payload",)
+
     def __init__(self, payload):
         self._payload = payload
 
-    def execute(self):
+    def execute(self, http=None, num_retries=0):
         return self._payload
 
 
+# ---- Canned API responses ----
+# Built once and returned as-is; the managers only read them.
+_FOLDER_PAYLOAD = {
+    "files": [
+        {"id": "folder1", "name": "Folder One", "parents": ["root"]},
+        {"id": "folder2", "name": "Folder Two", "parents": ["root"]},
+        {"id": "folder3", "name": "Folder Three", "parents": ["root"]},
+    ]
+}
+
+# Non-folder files (media and non-media)
+_FILE_PAYLOAD = {
+    "files": [
+        {
+            "id": "file1",
+            "name": "photo1.jpg",
+            "mimeType": "image/jpeg",
+            "parents": ["root"],
+        },
+        {
+            "id": "file2",
+            "name": "video1.mp4",
+            "mimeType": "video/mp4",
+            "parents": ["root"],
+        },
+        {
+            "id": "file3",
+            "name": "notes.txt",
+            "mimeType": "text/plain",
+            "parents": ["root"],
+        },
+    ]
+}
+
+_MEDIA_PAYLOAD = {
+    "mediaItems": [
+        {
+            "id": "m1",
+            "filename": "IMG_0001.JPG",
+            "mimeType": "image/jpeg",
+            "baseUrl": "https://example.com/m1",
+            "mediaMetadata": {
+                "creationTime": "2024-01-01T12:00:00Z",
+                "width": "4032",
+                "height": "3024",
+                "photo": {
+                    "cameraMake": "Apple",
+                    "cameraModel": "iPhone",
+                },
+            },
+        },
+        {
+            "id": "m2",
+            "filename": "VID_0001.MP4",
+            "mimeType": "video/mp4",
+            "baseUrl": "https://example.com/m2",
+            "mediaMetadata": {
+                "creationTime": "2024-01-02T10:00:00Z",
+                "width": "1920",
+                "height": "1080",
+                "video": {
+                    "fps": 30.0,
+                    "status": "READY",
+                },
+            },
+        },
+    ]
+}
+
+_FOLDER_EXEC = _ExecWrapper(_FOLDER_PAYLOAD)
+_FILE_EXEC = _ExecWrapper(_FILE_PAYLOAD)
+
+
+def _freeze(value):
+    """Return a deeply read-only copy: dicts become mapping proxies, lists tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Read-only at every level, so a test that mutates the shared response fails loudly
+_MEDIA_EXEC = _ExecWrapper(_freeze(_MEDIA_PAYLOAD))
+
+
 # ---- Fake Drive API ----
+# Present only in queries that select folders; file queries use mimeType!=
+_FOLDER_QUERY_MARKER = "mimeType='application/vnd.google-apps.folder'"
+
+
 class FakeDriveFiles:
-    def __init__(self):
-        self._last_query = None
-
-    def list(self, q=None, fields=None, pageToken=None, pageSize=None):
-        self._last_query = q or ""
-        # Decide response based on query (folders vs files)
-        if "mimeType='application/vnd.google-apps.folder'" in self._last_query:
-            payload = {
-                "files": [
-                    {"id": "folder1", "name": "Folder One", "parents": ["root"]},
-                    {"id": "folder2", "name": "Folder Two", "parents": ["root"]},
-                    {"id": "folder3", "name": "Folder Three", "parents": ["root"]},
-                ]
-            }
-        else:
-            # Non-folder files (media and non-media)
-            payload = {
-                "files": [
-                    {
-                        "id": "file1",
-                        "name": "photo1.jpg",
-                        "mimeType": "image/jpeg",
-                        "parents": ["root"],
-                    },
-                    {
-                        "id": "file2",
-                        "name": "video1.mp4",
-                        "mimeType": "video/mp4",
-                        "parents": ["root"],
-                    },
-                    {
-                        "id": "file3",
-                        "name": "notes.txt",
-                        "mimeType": "text/plain",
-                        "parents": ["root"],
-                    },
-                ]
-            }
-        return _ExecWrapper(payload)
+    __slots__ = ()
+
+    def list(self, q=None, fields=None, pageToken=None, pageSize=None, **kwargs):
+        return _FOLDER_EXEC if _FOLDER_QUERY_MARKER in (q or "") else _FILE_EXEC
 
 
 class FakeDriveService:
+    __slots__ = ("_files",)
+
+    def __init__(self):
+        self._files = FakeDriveFiles()
+
     def files(self):
-        return FakeDriveFiles()
+        return self._files
 
 
 # ---- Fake Photos API ----
 class FakeMediaItems:
+    __slots__ = ("_last_body",)
+
     def __init__(self):
         self._last_body = None
 
-    def search(self, body=None):
+    def search(self, body=None, fields=None):
         self._last_body = body or {}
-        return _ExecWrapper(
-            {
-                "mediaItems": [
-                    {
-                        "id": "m1",
-                        "filename": "IMG_0001.JPG",
-                        "mimeType": "image/jpeg",
-                        "baseUrl": "https://example.com/m1",
-                        "mediaMetadata": {
-                            "creationTime": "2024-01-01T12:00:00Z",
-                            "width": "4032",
-                            "height": "3024",
-                            "photo": {
-                                "cameraMake": "Apple",
-                                "cameraModel": "iPhone",
-                            },
-                        },
-                    },
-                    {
-                        "id": "m2",
-                        "filename": "VID_0001.MP4",
-                        "mimeType": "video/mp4",
-                        "baseUrl": "https://example.com/m2",
-                        "mediaMetadata": {
-                            "creationTime": "2024-01-02T10:00:00Z",
-                            "width": "1920",
-                            "height": "1080",
-                            "video": {
-                                "fps": 30.0,
-                                "status": "READY",
-                            },
-                        },
-                    },
-                ]
-            }
-        )
+        return _MEDIA_EXEC
 
     # Provide list as well for completeness (not used by these tests)
-    def list(self, body=None):
-        return self.search(body=body)
+    def list(self, body=None, fields=None):
+        return self.search(body=body, fields=fields)
 
 
 class FakePhotosService:
+    __slots__ = ("_media_items",)
+
+    def __init__(self):
+        self._media_items = FakeMediaItems()
+
     def mediaItems(self):
-        return FakeMediaItems()
+        return self._media_items
 
 
 # ---- Fake Auth Manager exposed via fixture ----
 class FakeAuthManager:
+    __slots__ = ("_drive", "_photos")
+
     def __init__(self):
         self._drive = FakeDriveService()
         self._photos = FakePhotosService()
@@ -132,14 +168,50 @@ class FakeAuthManager:
         return True
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def auth_manager():
-    """Provide a fake auth manager suitable for running in CI without credentials."""
+    """Provide a fake auth manager suitable for running in CI without credentials.
+
+    The fakes are stateless, so one instance is shared by the whole session.
+    """
     return FakeAuthManager()
 
 
 @pytest.fixture
 def drive_manager(auth_manager):
     """Provide a DriveManager wired to a fake Drive service."""
-    return DriveManager(auth_manager.get_drive_service())
+    from google_drive_sync.drive_manager import DriveManager
+
+    manager = DriveManager(auth_manager.get_drive_service())
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def photos_manager(auth_manager):
+    """Provide a PhotosManager wired to a fake Photos service."""
+    from google_drive_sync.photos_manager import PhotosManager
+
+    manager = PhotosManager(auth_manager.get_photos_service())
+    yield manager
+    manager.close()
 
+
+# ---- Listings fetched through each test's own managers ----
+@pytest.fixture
+def root_folders(drive_manager):
+    """Folders in the fake Drive root."""
+    return drive_manager.list_folders()
+
+
+@pytest.fixture
+def root_files(drive_manager):
+    """Files directly in the fake Drive root."""
+    return drive_manager.get_folder_contents('root', recursive=False)
+
+
+@pytest.fixture
+def sample_media(photos_manager):
+    """A small sample of the fake Photos library."""
+    # We'll test with a small search to avoid long loading times
+    return photos_manager.search_media_items()[:5]  # Just get first 5
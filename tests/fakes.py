@@ -0,0 +1,11 @@
+"""Fake Google API objects shared by the manager tests"""
+
+
+class FakeRequest:
+    """Stand-in for googleapiclient's HttpRequest that runs a function on execute()"""
+
+    def __init__(self, func):
+        self._func = func
+
+    def execute(self, http=None, num_retries=0):
+        return self._func()
@@ -0,0 +1,53 @@
+"""Tests for the ConflictResolver formatting helpers"""
+
+import pytest
+
+from google_drive_sync.conflict_resolver import ConflictResolver
+
+
+@pytest.mark.parametrize("size, expected", [
+    ("0", "0.0 B"),
+    (1023, "1023.0 B"),
+    ("1024", "1.0 KB"),
+    (5 * 1024 ** 2 + 1024 ** 2 // 2, "5.5 MB"),
+    (3 * 1024 ** 3, "3.0 GB"),
+    (2048 * 1024 ** 4, "2048.0 TB"),
+    ("not a number", "Unknown"),
+    (None, "Unknown"),
+])
+def test_format_size(size, expected):
+    assert ConflictResolver(None)._format_size(size) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2023-06-01T12:30:45Z", "2023-06-01 12:30:45"),
+    ("2023-06-01T12:30:45.123+00:00", "2023-06-01 12:30:45"),
+    ("2023-06-01", "2023-06-01"),
+    ("garbageTZ", "garbageTZ"),
+    ("", "Unknown"),
+    (None, "Unknown"),
+])
+def test_format_datetime(value, expected):
+    assert ConflictResolver(None)._format_datetime(value) == expected
+
+
+def test_auto_resolve_batch_only_leaves_ambiguous_pairs():
+    same_time = {
+        "drive_file": {"name": "a.jpg", "createdTime": "2024-01-01T12:00:00Z"},
+        "photos_item": {"filename": "a.jpg", "creation_time": "2024-01-01T12:00:00.400Z"},
+    }
+    same_modified_time = {
+        "drive_file": {"name": "b.jpg", "createdTime": "2024-01-05T00:00:00Z",
+                       "modifiedTime": "2020-01-01T00:00:00Z"},
+        "photos_item": {"filename": "b.jpg", "creation_time": "2020-01-01T00:00:00Z"},
+    }
+    ambiguous = {
+        "drive_file": {"name": "c.jpg", "createdTime": "2024-01-05T00:00:00Z"},
+        "photos_item": {"filename": "c.jpg", "creation_time": "2024-01-01T00:00:00Z"},
+    }
+
+    resolved, remaining = ConflictResolver(None).auto_resolve_batch([same_time, same_modified_time, ambiguous])
+
+    assert [r["drive_file"]["name"] for r in resolved] == ["a.jpg", "b.jpg"]
+    assert all(r["resolution"] == "same" for r in resolved)
+    assert remaining == [ambiguous]
@@ -0,0 +1,330 @@
+"""Tests for DriveManager tree listing and batch helpers against an in-memory Drive"""
+
+import sys
+import threading
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from google_drive_sync import drive_manager as drive_manager_module
+from google_drive_sync.drive_manager import FOLDER_MIME_TYPE, DriveManager
+
+from .fakes import FakeRequest
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self._service = service
+        self._callback = callback
+        self._requests = []
+
+    def add(self, request, request_id=None):
+        self._requests.append((request_id, request))
+
+    def execute(self, http=None):
+        self._service.batches_executed += 1
+        for request_id, request in self._requests:
+            try:
+                response, error = request.execute(), None
+            except (KeyError, HttpError) as e:
+                response, error = None, e
+            self._callback(request_id, response, error)
+
+
+class _TreeFiles:
+    """files() resource serving a fixed folder tree, two items per page"""
+
+    PAGE_SIZE = 2
+
+    def __init__(self, items, deleted, failing):
+        self._items = items
+        self._deleted = deleted
+        self._failing = failing
+
+    def list(self, q=None, fields=None, pageToken=None, pageSize=None, **kwargs):
+        parent_id = q.split("'")[1]
+        if parent_id in self._failing:
+            def fail():
+                raise HttpError(httplib2.Response({"status": 404}), b"not found")
+            return FakeRequest(fail)
+        children = [item for item in self._items.values() if parent_id in item["parents"]]
+        start = int(pageToken or 0)
+        page = {"files": children[start:start + self.PAGE_SIZE]}
+        if start + self.PAGE_SIZE < len(children):
+            page["nextPageToken"] = str(start + self.PAGE_SIZE)
+        return FakeRequest(lambda: page)
+
+    def get(self, fileId=None, fields=None, **kwargs):
+        if fileId == "root":
+            return FakeRequest(lambda: {"id": "root"})
+        return FakeRequest(lambda: self._items[fileId])
+
+    def create(self, body=None, media_body=None, fields=None):
+        self._items["new"] = {"id": "new", "parents": body["parents"], "media": media_body}
+        return FakeRequest(lambda: {"id": "new"})
+
+    def delete(self, fileId=None):
+        def run():
+            del self._items[fileId]
+            self._deleted.append(fileId)
+        return FakeRequest(run)
+
+
+class _Changes:
+    """changes() resource replaying a fixed list of changes after the start token"""
+
+    def __init__(self, feed):
+        self._feed = feed
+
+    def getStartPageToken(self):
+        return FakeRequest(lambda: {"startPageToken": "1"})
+
+    def list(self, pageToken=None, **kwargs):
+        changes = self._feed if pageToken == "1" else []
+        return FakeRequest(lambda: {"changes": changes, "newStartPageToken": "2"})
+
+
+class _TreeService:
+    def __init__(self, items):
+        self.items = items
+        self.deleted = []
+        self.batches_executed = 0
+        self.changes_feed = []
+        self.failing_folders = set()
+
+    def files(self):
+        return _TreeFiles(self.items, self.deleted, self.failing_folders)
+
+    def changes(self):
+        return _Changes(self.changes_feed)
+
+    def new_batch_http_request(self, callback=None):
+        return _Batch(self, callback)
+
+
+def _folder(item_id, parent):
+    return {"id": item_id, "name": item_id, "mimeType": FOLDER_MIME_TYPE, "parents": [parent]}
+
+
+def _file(item_id, parent):
+    return {"id": item_id, "name": f"{item_id}.jpg", "mimeType": "image/jpeg", "parents": [parent]}
+
+
+@pytest.fixture
+def tree_service():
+    items = [
+        _folder("a", "root"),
+        _folder("b", "root"),
+        _file("f1", "root"),
+        _file("f2", "a"),
+        _file("f3", "a"),
+        _file("f4", "a"),
+        _folder("c", "b"),
+        _file("f5", "c"),
+    ]
+    return _TreeService({item["id"]: item for item in items})
+
+
+def test_recursive_listing_walks_every_level(tree_service):
+    files = DriveManager(tree_service).get_folder_contents("root", recursive=True)
+
+    assert sorted(f["id"] for f in files) == ["f1", "f2", "f3", "f4", "f5"]
+    # Follow-up pages share a batch with the next level: root, root(p2)+a+b, a(p2)+c
+    assert tree_service.batches_executed == 3
+
+
+def test_large_levels_are_split_into_parallel_batches(tree_service, monkeypatch):
+    monkeypatch.setattr(drive_manager_module, "MAX_BATCH_SIZE", 1)
+
+    files = DriveManager(tree_service).get_folder_contents("root", recursive=True)
+
+    assert sorted(f["id"] for f in files) == ["f1", "f2", "f3", "f4", "f5"]
+    assert tree_service.batches_executed == 6
+
+
+def test_iter_folder_contents_yields_before_the_tree_is_walked(tree_service):
+    items = DriveManager(tree_service).iter_folder_contents("root", recursive=True)
+
+    # The root's first page only holds folders; files arrive with the second batch
+    first = next(items)
+    assert tree_service.batches_executed == 2
+    assert sorted(f["id"] for f in [first, *items]) == ["f1", "f2", "f3", "f4", "f5"]
+    assert tree_service.batches_executed == 3
+
+
+def test_repeat_listing_is_served_from_cache_until_invalidated(tree_service):
+    manager = DriveManager(tree_service)
+
+    first = manager.get_folder_contents("root", recursive=True)
+    first.clear()
+    second = manager.get_folder_contents("root", recursive=True)
+
+    assert len(second) == 5
+    assert tree_service.batches_executed == 3
+
+    manager.batch_delete(["f1"])
+    third = manager.get_folder_contents("root", recursive=True)
+
+    assert sorted(f["id"] for f in third) == ["f2", "f3", "f4", "f5"]
+
+
+def test_cache_invalidation_is_safe_from_several_threads(tree_service):
+    manager = DriveManager(tree_service)
+    # A large cache keeps invalidate_cache iterating long enough for listings to interleave
+    for i in range(20000):
+        manager._listing_cache[(f"old-{i}", False, "fields")] = (0.0, [])
+    errors = []
+
+    def run(work, *args):
+        try:
+            work(*args)
+        except Exception as e:
+            errors.append(e)
+
+    def invalidate():
+        for _ in range(50):
+            manager.invalidate_cache("unrelated")
+
+    def list_folders(worker):
+        for i in range(2000):
+            manager.get_folder_contents(f"{worker}-{i}", recursive=False)
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=run, args=(invalidate,)) for _ in range(2)]
+        threads += [threading.Thread(target=run, args=(list_folders, worker)) for worker in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert errors == []
+
+
+def test_tree_listing_with_a_failed_folder_is_not_cached(tree_service):
+    manager = DriveManager(tree_service)
+    tree_service.failing_folders.add("c")
+
+    assert "f5" not in [f["id"] for f in manager.get_folder_contents("root", recursive=True)]
+
+    tree_service.failing_folders.clear()
+    files = manager.get_folder_contents("root", recursive=True)
+
+    assert sorted(f["id"] for f in files) == ["f1", "f2", "f3", "f4", "f5"]
+
+
+def test_tree_listing_rejects_a_projection_without_files(tree_service):
+    with pytest.raises(ValueError, match="files"):
+        DriveManager(tree_service).get_tree_contents("root", fields="nextPageToken")
+
+
+def test_batch_get_file_info_reports_missing_files(tree_service):
+    info = DriveManager(tree_service).batch_get_file_info(["f1", "missing", "f1"])
+
+    assert info["f1"]["name"] == "f1.jpg"
+    assert info["missing"] is None
+    assert len(info) == 2
+
+
+def test_rate_limited_batch_calls_are_retried(tree_service, monkeypatch):
+    monkeypatch.setattr(drive_manager_module, "RETRY_BASE_DELAY", 0)
+    files = tree_service.files()
+    attempts = []
+
+    def flaky_get(fileId=None, fields=None, **kwargs):
+        def run():
+            attempts.append(fileId)
+            if len(attempts) == 1:
+                raise HttpError(httplib2.Response({"status": 429}), b"rate limited")
+            return tree_service.items[fileId]
+        return FakeRequest(run)
+
+    monkeypatch.setattr(files, "get", flaky_get)
+    monkeypatch.setattr(tree_service, "files", lambda: files)
+
+    info = DriveManager(tree_service).batch_get_file_info(["f1"])
+
+    assert info["f1"]["name"] == "f1.jpg"
+    assert attempts == ["f1", "f1"]
+
+
+def test_batch_delete(tree_service):
+    results = DriveManager(tree_service).batch_delete(["f1", "f2"])
+
+    assert results == {"f1": True, "f2": True}
+    assert sorted(tree_service.deleted) == ["f1", "f2"]
+
+
+def test_file_info_is_served_from_the_metadata_cache(tree_service, tmp_path):
+    manager = DriveManager(tree_service, cache_path=tmp_path / "cache.db")
+    assert manager.get_file_info("f1")["name"] == "f1.jpg"
+
+    del tree_service.items["f1"]
+
+    assert manager.get_file_info("f1")["name"] == "f1.jpg"
+    assert manager.batch_get_file_info(["f1", "f2"])["f2"]["name"] == "f2.jpg"
+    manager.close()
+
+
+def test_sync_changes_applies_deltas_since_the_stored_token(tree_service, tmp_path):
+    manager = DriveManager(tree_service, cache_path=tmp_path / "cache.db")
+    manager.batch_get_file_info(["f1", "f2"])
+    assert manager.sync_changes() == 0  # First run only records the start token
+
+    tree_service.changes_feed.extend([
+        {"fileId": "f1", "removed": True},
+        {"fileId": "f2", "file": {**tree_service.items["f2"], "name": "renamed.jpg"}},
+    ])
+    del tree_service.items["f1"]
+
+    assert manager.sync_changes() == 2
+    assert manager.batch_get_file_info(["f1"])["f1"] is None
+    assert manager.get_file_info("f2")["name"] == "renamed.jpg"
+    assert manager.sync_changes() == 0
+    manager.close()
+
+
+def test_tree_contents_are_replayed_from_changes_on_the_next_run(tree_service, tmp_path):
+    cache_path = tmp_path / "cache.db"
+    manager = DriveManager(tree_service, cache_path=cache_path)
+    assert sorted(f["id"] for f in manager.get_tree_contents("root")) == ["f1", "f2", "f3", "f4", "f5"]
+    manager.close()
+
+    tree_service.changes_feed.extend([
+        {"fileId": "f2", "removed": True},
+        {"fileId": "f6", "file": _file("f6", "c")},
+        {"fileId": "elsewhere", "file": _file("elsewhere", "not-in-tree")},
+    ])
+    batches = tree_service.batches_executed
+    manager = DriveManager(tree_service, cache_path=cache_path)
+
+    assert sorted(f["id"] for f in manager.get_tree_contents("root")) == ["f1", "f3", "f4", "f5", "f6"]
+    assert tree_service.batches_executed == batches  # Nothing was listed again
+    manager.close()
+
+
+def test_tree_contents_are_listed_again_when_a_folder_changes(tree_service, tmp_path):
+    manager = DriveManager(tree_service, cache_path=tmp_path / "cache.db")
+    manager.get_tree_contents("root")
+    tree_service.changes_feed.append({"fileId": "d", "file": _folder("d", "a")})
+    tree_service.items["d"] = _folder("d", "a")
+    tree_service.items["f7"] = _file("f7", "d")
+
+    assert "f7" in {f["id"] for f in manager.get_tree_contents("root")}
+    manager.close()
+
+
+def test_small_files_are_uploaded_without_a_resumable_session(tree_service, tmp_path):
+    local = tmp_path / "small.jpg"
+    local.write_bytes(b"\xff\xd8" * 100)
+
+    file_id = DriveManager(tree_service).upload_file(local, "small.jpg", "a")
+
+    assert file_id == "new"
+    media = tree_service.items["new"]["media"]
+    assert not media.resumable()
+    assert media.mimetype() == "image/jpeg"
@@ -0,0 +1,324 @@
+"""Tests for PhotosManager against an in-memory Photos library"""
+
+import io
+import threading
+
+import pytest
+import requests
+
+from google_drive_sync import photos_manager as photos_manager_module
+from google_drive_sync.photos_manager import PhotosManager
+
+from .fakes import FakeRequest
+
+
+class _MediaItems:
+    """mediaItems() resource serving a fixed library, three items per page"""
+
+    PAGE_SIZE = 3
+
+    def __init__(self, library):
+        self._library = library
+        self.bodies = []
+        self.fields = []
+        self.created = []
+        self.batch_gets = []
+
+    def _page(self, body, fields=None):
+        self.bodies.append(body)
+        self.fields.append(fields)
+        start = int(body.get("pageToken") or 0)
+        page = {"mediaItems": self._library[start:start + self.PAGE_SIZE]}
+        if start + self.PAGE_SIZE < len(self._library):
+            page["nextPageToken"] = str(start + self.PAGE_SIZE)
+        return FakeRequest(lambda: page)
+
+    def list(self, body=None, fields=None):
+        return self._page(body, fields)
+
+    def search(self, body=None, fields=None):
+        return self._page(body, fields)
+
+    def batchGet(self, mediaItemIds=None, fields=None):
+        self.batch_gets.append(list(mediaItemIds))
+        by_id = {item["id"]: item for item in self._library}
+        results = [{"mediaItem": by_id[item_id]} for item_id in mediaItemIds if item_id in by_id]
+        return FakeRequest(lambda: {"mediaItemResults": results})
+
+    def batchCreate(self, body=None):
+        self.created.append(body)
+        results = [
+            {"status": {"message": "Success"},
+             "mediaItem": {"id": item["simpleMediaItem"]["uploadToken"].replace("token", "item")}}
+            for item in body["newMediaItems"]
+        ]
+        return FakeRequest(lambda: {"newMediaItemResults": results})
+
+
+class _Credentials:
+    token = "access-token"
+
+
+class _Http:
+    credentials = _Credentials()
+
+
+class _PhotosService:
+    _http = _Http()
+
+    def __init__(self, library):
+        self.media_items = _MediaItems(library)
+
+    def mediaItems(self):
+        return self.media_items
+
+
+@pytest.fixture
+def photos_service():
+    library = [{"id": f"m{i}", "filename": f"IMG_{i:04d}.JPG", "mediaMetadata": {"photo": {}}}
+               for i in range(8)]
+    return _PhotosService(library)
+
+
+def test_get_all_media_items_follows_every_page(photos_service):
+    items = PhotosManager(photos_service).get_all_media_items()
+
+    assert [item["id"] for item in items] == [f"m{i}" for i in range(8)]
+    assert [body.get("pageToken") for body in photos_service.media_items.bodies] == [None, "3", "6"]
+
+
+def test_search_keeps_filters_on_every_page(photos_service):
+    filters = {"mediaTypeFilter": {"mediaTypes": ["PHOTO"]}}
+
+    items = PhotosManager(photos_service).search_media_items(filters)
+
+    assert len(items) == 8
+    assert all(body["filters"] == filters for body in photos_service.media_items.bodies)
+
+
+def test_listing_requests_a_partial_response(photos_service):
+    manager = PhotosManager(photos_service)
+
+    manager.get_all_media_items()
+    manager.search_media_items(fields=photos_manager_module.MEDIA_ID_FIELDS)
+
+    fields = photos_service.media_items.fields
+    assert fields[:3] == [photos_manager_module.MEDIA_ITEM_FIELDS] * 3
+    assert fields[3:] == ["nextPageToken,mediaItems/id"] * 3
+
+
+class _StreamedResponse:
+    def __init__(self, body):
+        self.raw = io.BytesIO(body)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+
+def test_download_streams_the_body_to_disk(photos_service, tmp_path, monkeypatch):
+    requested = []
+
+    def fake_get(url, **kwargs):
+        requested.append((url, kwargs))
+        return _StreamedResponse(b"x" * 3000)
+
+    manager = PhotosManager(photos_service)
+    monkeypatch.setattr(manager._session, "get", fake_get)
+    item = {"id": "m1", "filename": "IMG.JPG", "baseUrl": "https://example.com/m1"}
+    target = tmp_path / "out" / "IMG.JPG"
+
+    assert manager.download_media_item(item, target)
+
+    assert target.read_bytes() == b"x" * 3000
+    assert requested[0][0] == "https://example.com/m1=d"
+    assert requested[0][1]["stream"] is True
+
+
+def test_download_skips_a_file_already_present(photos_service, tmp_path, monkeypatch):
+    class _Head:
+        ok = True
+        headers = {"Content-Length": "3000"}
+
+    manager = PhotosManager(photos_service)
+    monkeypatch.setattr(manager._session, "head", lambda url, **kwargs: _Head())
+    monkeypatch.setattr(manager._session, "get", lambda url, **kwargs: pytest.fail("downloaded again"))
+    item = {"id": "m1", "filename": "IMG.JPG", "baseUrl": "https://example.com/m1"}
+    target = tmp_path / "IMG.JPG"
+    target.write_bytes(b"x" * 3000)
+
+    assert manager.download_media_item(item, target)
+
+
+def test_download_many_reports_each_item(photos_service, tmp_path, monkeypatch):
+    manager = PhotosManager(photos_service)
+    monkeypatch.setattr(manager._session, "get", lambda url, **kwargs: _StreamedResponse(url.encode()))
+    items = [{"id": f"m{i}", "baseUrl": f"https://example.com/m{i}"} for i in range(4)]
+    items.append({"id": "no-url"})
+
+    results = manager.download_many([(item, tmp_path / f"{item['id']}.jpg") for item in items])
+
+    assert results == [True, True, True, True, False]
+    assert (tmp_path / "m2.jpg").read_bytes() == b"https://example.com/m2=d"
+
+
+def test_upload_many_creates_items_in_batches_of_50(photos_service, monkeypatch):
+    manager = PhotosManager(photos_service)
+    tokens = {f"/photos/{i}.jpg": f"token{i}" for i in range(120)}
+    tokens["/photos/7.jpg"] = None
+    monkeypatch.setattr(manager, "_upload_file_for_token", lambda path: tokens[str(path)])
+
+    ids = manager.upload_many(list(tokens))
+
+    assert [len(body["newMediaItems"]) for body in photos_service.media_items.created] == [50, 50, 19]
+    assert ids[0] == "item0"
+    assert ids[7] is None
+    assert ids[119] == "item119"
+    first = photos_service.media_items.created[0]["newMediaItems"][0]
+    assert first["simpleMediaItem"]["fileName"] == "0.jpg"
+    assert first["description"] == "0.jpg"
+
+
+def test_upload_many_skips_contents_uploaded_before(photos_service, tmp_path, monkeypatch):
+    first = tmp_path / "a.jpg"
+    copy = tmp_path / "copy-of-a.jpg"
+    first.write_bytes(b"same bytes")
+    copy.write_bytes(b"same bytes")
+    uploaded = []
+
+    def fake_upload(path):
+        uploaded.append(path)
+        return "token1"
+
+    with PhotosManager(photos_service, cache_path=tmp_path / "photos.db") as manager:
+        monkeypatch.setattr(manager, "_upload_file_for_token", fake_upload)
+        assert manager.upload_many([first]) == ["item1"]
+        assert manager.upload_many([copy]) == ["item1"]
+
+    assert uploaded == [first]
+
+
+class _UploadResponse:
+    def __init__(self, headers=None, text=""):
+        self.headers = headers or {}
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class _UploadServer:
+    """Resumable upload endpoint that drops the second chunk it receives once"""
+
+    def __init__(self):
+        self.received = b""
+        self.chunks = 0
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        command = headers["X-Goog-Upload-Command"]
+        if command == "start":
+            return _UploadResponse({"X-Goog-Upload-URL": "https://upload/session"})
+        if command == "query":
+            return _UploadResponse({"X-Goog-Upload-Size-Received": str(len(self.received))})
+        assert int(headers["X-Goog-Upload-Offset"]) == len(self.received)
+        self.chunks += 1
+        if self.chunks == 2:
+            raise requests.ConnectionError("connection reset")
+        self.received += data
+        return _UploadResponse(text="upload-token" if "finalize" in command else "")
+
+
+def test_upload_resumes_after_a_failed_chunk(photos_service, tmp_path, monkeypatch):
+    monkeypatch.setattr(photos_manager_module, "UPLOAD_CHUNK_SIZE", 4)
+    local = tmp_path / "clip.mp4"
+    local.write_bytes(b"0123456789")
+    server = _UploadServer()
+    manager = PhotosManager(photos_service)
+    monkeypatch.setattr(manager, "_session", server)
+
+    assert manager._upload_file_for_token(local) == "upload-token"
+    assert server.received == b"0123456789"
+
+
+def test_parse_media_metadata(photos_service):
+    manager = PhotosManager(photos_service)
+    video = manager.parse_media_metadata({
+        "id": "v1",
+        "filename": "VID.MP4",
+        "mediaMetadata": {"creationTime": "2024-01-02T10:00:00Z", "video": {"fps": 30.0}},
+    })
+    bare = manager.parse_media_metadata({"id": "x", "mediaMetadata": None})
+
+    assert video["is_video"] and not video["is_photo"]
+    assert video["fps"] == 30.0
+    assert video["creation_time"] == "2024-01-02T10:00:00Z"
+    assert bare["creation_time"] is None
+    assert not bare["is_video"] and not bare["is_photo"]
+
+
+def test_iter_all_media_items_fetches_pages_as_needed(photos_service):
+    items = PhotosManager(photos_service).iter_all_media_items()
+
+    assert [next(items)["id"] for _ in range(3)] == ["m0", "m1", "m2"]
+    # Only the first page and the prefetched second page have been requested
+    assert len(photos_service.media_items.bodies) <= 2
+    assert len(list(items)) == 5
+
+
+def test_auth_header_refreshes_only_near_expiry(photos_service, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    def naive_utcnow():
+        # google-auth's Credentials.expiry is a naive datetime in UTC
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    class _ExpiringCredentials:
+        expiry = naive_utcnow() + timedelta(minutes=1)
+        token = "old-token"
+        refreshes = 0
+
+        def refresh(self, request):
+            self.refreshes += 1
+            self.token = "new-token"
+            self.expiry = naive_utcnow() + timedelta(hours=1)
+
+    creds = _ExpiringCredentials()
+    monkeypatch.setattr(photos_service._http, "credentials", creds)
+    manager = PhotosManager(photos_service)
+
+    assert manager._auth_header() == {"Authorization": "Bearer new-token"}
+    assert manager._auth_header() == {"Authorization": "Bearer new-token"}
+    assert creds.refreshes == 1
+
+
+def test_item_cache_reconciles_against_the_library_ids(photos_service, tmp_path):
+    cache_path = tmp_path / "photos.db"
+    with PhotosManager(photos_service, cache_path=cache_path) as manager:
+        assert len(manager.get_all_media_items()) == 8
+
+    library = photos_service.media_items._library
+    library.insert(5, {"id": "new", "filename": "NEW.JPG"})  # Listed after cached items
+    del library[0]
+    photos_service.media_items.fields.clear()
+    with PhotosManager(photos_service, cache_path=cache_path) as manager:
+        items = manager.get_all_media_items()
+
+    assert sorted(item["id"] for item in items) == sorted(["new"] + [f"m{i}" for i in range(1, 8)])
+    assert photos_service.media_items.batch_gets == [["new"]]
+    assert set(photos_service.media_items.fields) == {photos_manager_module.MEDIA_ID_FIELDS}
+
+
+def test_api_calls_use_one_http_connection_per_thread(photos_service):
+    manager = PhotosManager(photos_service)
+    other_thread = []
+    worker = threading.Thread(target=lambda: other_thread.append(manager._thread_http()))
+    worker.start()
+    worker.join()
+
+    assert manager._thread_http() is manager._thread_http()
+    assert other_thread[0] is not manager._thread_http()
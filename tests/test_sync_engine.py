@@ -0,0 +1,226 @@
+"""Tests for SyncEngine with stub Drive and Photos managers"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from google_drive_sync.sync_engine import SyncEngine
+
+
+class _StubDrive:
+    def __init__(self):
+        self.uploaded = []
+        self.changes_synced = 0
+
+    def sync_changes(self):
+        self.changes_synced += 1
+        return 0
+
+    def download_file(self, file_id, local_path):
+        return file_id != "broken"
+
+    def upload_file(self, local_path, filename, parent_folder_id):
+        self.uploaded.append(filename)
+        return f"id-{filename}"
+
+
+class _StubPhotos:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.release = threading.Event()
+
+    def upload_media_item(self, local_path, filename=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        self.release.wait(timeout=1)
+        with self.lock:
+            self.in_flight -= 1
+        return "item"
+
+    def download_media_item(self, media_item, local_path, force=False):
+        return True
+
+
+def _engine(max_workers=4):
+    return SyncEngine(_StubDrive(), _StubPhotos(), conflict_resolver=None,
+                      drive_folder_id="folder", max_workers=max_workers)
+
+
+def test_sync_operations_run_concurrently_and_count_results():
+    engine = _engine()
+    drive_only = [{"id": f"f{i}", "name": f"{i}.jpg"} for i in range(6)]
+    drive_only.append({"id": "broken", "name": "broken.jpg"})
+    progress = []
+    threading.Timer(0.2, engine.photos_manager.release.set).start()
+
+    engine._perform_sync_operations({"drive_only": drive_only, "photos_only": []},
+                                    progress_callback=progress.append)
+
+    assert engine.photos_manager.peak > 1
+    assert engine.stats["drive_to_photos_uploads"] == 6
+    assert engine.stats["errors"] == 1
+    assert progress[-1] == 100
+
+
+def test_compare_files_joins_on_the_lowercased_name():
+    engine = _engine()
+    drive_files = [
+        {"id": "d1", "name": "IMG_1.JPG", "createdTime": "2024-01-01T10:00:00Z"},
+        {"id": "d2", "name": "img_2.jpg", "createdTime": "2024-01-01T10:00:00Z"},
+        {"id": "d3", "name": "drive-only.jpg", "createdTime": "2024-01-01T10:00:00Z"},
+    ]
+    photos = [
+        {"id": "p1", "filename": "img_1.jpg", "creation_time": "2024-01-01T11:00:00Z"},
+        {"id": "p2", "filename": "IMG_2.JPG", "creation_time": "2024-03-01T10:00:00Z"},
+        {"id": "p3", "filename": "photos-only.jpg", "creation_time": "2024-01-01T10:00:00Z"},
+    ]
+
+    result = engine._compare_files(drive_files, photos)
+
+    assert [(m["drive_file"]["id"], m["photos_item"]["id"]) for m in result["matches"]] == [("d1", "p1")]
+    assert [(c["drive_file"]["id"], c["photos_item"]["id"]) for c in result["conflicts"]] == [("d2", "p2")]
+    assert [f["id"] for f in result["drive_only"]] == ["d3"]
+    assert [p["id"] for p in result["photos_only"]] == ["p3"]
+
+
+def test_compare_files_matches_identical_times_without_parsing(monkeypatch):
+    engine = _engine()
+    monkeypatch.setattr(engine, "_are_dates_similar", lambda *args: pytest.fail("dates parsed"))
+    drive_files = [{"id": "d1", "name": "a.jpg", "createdTime": "2024-01-01T10:00:00Z"}]
+    photos = [{"id": "p1", "filename": "a.jpg", "creation_time": "2024-01-01T10:00:00Z"}]
+
+    result = engine._compare_files(drive_files, photos)
+
+    assert [m["drive_file"]["id"] for m in result["matches"]] == ["d1"]
+    assert result["conflicts"] == []
+
+
+def test_photos_items_are_downloaded_as_media_items(monkeypatch):
+    engine = _engine()
+    calls = []
+    monkeypatch.setattr(engine.photos_manager, "download_media_item",
+                        lambda item, path, force=False: calls.append((item, force)) or True)
+    photos_item = {"id": "p1", "filename": "clip.mp4", "base_url": "https://example.com/p1", "is_video": True}
+
+    assert engine._download_photos_item_to_drive(photos_item)
+
+    item, force = calls[0]
+    assert item["baseUrl"] == "https://example.com/p1"
+    assert "video" in item["mediaMetadata"]
+    assert force
+    assert engine.drive_manager.uploaded == ["clip.mp4"]
+
+
+def test_compare_files_with_an_empty_side_skips_matching():
+    photos = [{"id": "p1", "filename": "a.jpg"}]
+
+    result = _engine()._compare_files([], photos)
+
+    assert result == {"drive_only": [], "photos_only": photos, "matches": [], "conflicts": []}
+
+
+def test_transfers_stage_files_in_a_temp_dir_removed_after_the_run(monkeypatch):
+    engine = _engine()
+    staged = []
+
+    def download_file(file_id, local_path):
+        staged.append(local_path)
+        open(local_path, "wb").close()
+        return False
+
+    monkeypatch.setattr(engine.drive_manager, "download_file", download_file)
+
+    engine._perform_sync_operations({"drive_only": [{"id": "f1", "name": "a.jpg"}], "photos_only": []})
+
+    assert staged[0].endswith("f1.jpg")
+    assert not os.path.exists(os.path.dirname(staged[0]))
+
+
+def test_drive_and_photos_are_scanned_concurrently(monkeypatch):
+    engine = _engine()
+    both_scanning = threading.Barrier(2, timeout=1)
+
+    def get_tree_contents(folder_id, fields=None):
+        both_scanning.wait()
+        return [{"id": "d1", "name": "a.jpg"}]
+
+    def iter_all_media_items():
+        both_scanning.wait()
+        yield {"id": "p1", "filename": "b.jpg"}
+
+    monkeypatch.setattr(engine.drive_manager, "get_tree_contents", get_tree_contents, raising=False)
+    monkeypatch.setattr(engine.drive_manager, "is_media_file", lambda f: True, raising=False)
+    monkeypatch.setattr(engine.photos_manager, "iter_all_media_items", iter_all_media_items, raising=False)
+    monkeypatch.setattr(engine.photos_manager, "parse_media_metadata", lambda item: item, raising=False)
+    compared = []
+    monkeypatch.setattr(engine, "_compare_files",
+                        lambda drive, photos, log=None: compared.append((drive, photos)) or
+                        {"drive_only": [], "photos_only": [], "matches": [], "conflicts": []})
+
+    engine.start_sync()
+
+    assert compared == [([{"id": "d1", "name": "a.jpg"}], [{"id": "p1", "filename": "b.jpg"}])]
+    assert engine.drive_manager.changes_synced == 1
+
+
+def test_photos_scan_is_stopped_and_awaited_when_the_drive_scan_fails(monkeypatch):
+    engine = _engine()
+    scanning = threading.Event()
+    listed = []
+
+    def get_tree_contents(folder_id, fields=None):
+        scanning.wait(timeout=1)
+        raise RuntimeError("drive unavailable")
+
+    def iter_all_media_items():
+        for i in range(1000):
+            listed.append(i)
+            scanning.set()
+            yield {"id": f"p{i}", "filename": f"{i}.jpg"}
+            time.sleep(0.001)
+
+    monkeypatch.setattr(engine.drive_manager, "get_tree_contents", get_tree_contents, raising=False)
+    monkeypatch.setattr(engine.photos_manager, "iter_all_media_items", iter_all_media_items, raising=False)
+    monkeypatch.setattr(engine.photos_manager, "parse_media_metadata", lambda item: item, raising=False)
+
+    with pytest.raises(RuntimeError):
+        engine.start_sync()
+
+    # The scan had finished by the time start_sync returned, well short of the library
+    count = len(listed)
+    time.sleep(0.05)
+    assert len(listed) == count < 1000
+
+
+def test_progress_is_reported_only_when_the_percentage_changes():
+    engine = _engine()
+    engine.photos_manager.release.set()
+    drive_only = [{"id": f"f{i}", "name": f"{i}.jpg"} for i in range(500)]
+    progress = []
+
+    engine._perform_sync_operations({"drive_only": drive_only, "photos_only": []},
+                                    progress_callback=progress.append)
+
+    assert progress[:-1] == list(range(50, 101))
+
+
+def test_compare_files_matches_each_photos_item_once():
+    drive_files = [
+        {"id": "d1", "name": "a.jpg", "createdTime": "2024-01-01T10:00:00Z"},
+        {"id": "d2", "name": "A.JPG", "createdTime": "2024-01-01T10:00:00Z"},
+    ]
+    photos = [
+        {"id": "p1", "filename": "a.jpg", "creation_time": "2024-01-01T10:00:00Z"},
+        {"id": "p2", "filename": "a.jpg", "creation_time": "2024-01-01T10:00:00Z"},
+    ]
+
+    result = _engine()._compare_files(drive_files, photos)
+
+    assert [(m["drive_file"]["id"], m["photos_item"]["id"]) for m in result["matches"]] == [("d1", "p2")]
+    assert [f["id"] for f in result["drive_only"]] == ["d2"]
+    assert [p["id"] for p in result["photos_only"]] == ["p1"]